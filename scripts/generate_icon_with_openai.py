@@ -11,6 +11,8 @@ from pathlib import Path
 
 from PIL import Image
 
+from generate_store_assets import optimize_assets
+
 
 ROOT = Path(__file__).resolve().parents[1]
 CANDIDATE_DIR = ROOT / "marketing" / "store-assets" / "generated" / "logo" / "openai-icon-candidates"
@@ -111,21 +113,24 @@ def ensure_dirs(paths: list[Path]) -> None:
         path.mkdir(parents=True, exist_ok=True)
 
 
-def sync_icon_assets(source_icon: Path) -> None:
+def sync_icon_assets(source_icon: Path) -> list[Path]:
     icon = Image.open(source_icon).convert("RGB")
     if icon.size != (1024, 1024):
         icon = icon.resize((1024, 1024), Image.Resampling.LANCZOS)
 
     ensure_dirs([APP_ASSETS_DIR, IOS_SPLASH_LEGACY_DIR])
-    icon.save(APP_ASSETS_DIR / "icon.png", quality=95)
-    icon.save(APP_ASSETS_DIR / "adaptive-icon.png", quality=95)
-    icon.save(APP_ASSETS_DIR / "splash-icon.png", quality=95)
-    icon.resize((48, 48), Image.Resampling.LANCZOS).save(APP_ASSETS_DIR / "favicon.png")
-
     IOS_APP_ICON_PATH.parent.mkdir(parents=True, exist_ok=True)
-    icon.save(IOS_APP_ICON_PATH, quality=95)
-    for splash_name in ("image.png", "image@2x.png", "image@3x.png"):
-        icon.save(IOS_SPLASH_LEGACY_DIR / splash_name, quality=95)
+    png_paths = [
+        APP_ASSETS_DIR / "icon.png",
+        APP_ASSETS_DIR / "adaptive-icon.png",
+        APP_ASSETS_DIR / "splash-icon.png",
+        IOS_APP_ICON_PATH,
+    ]
+    png_paths.extend(IOS_SPLASH_LEGACY_DIR / name for name in ("image.png", "image@2x.png", "image@3x.png"))
+    for path in png_paths:
+        icon.save(path)
+    icon.resize((48, 48), Image.Resampling.LANCZOS).save(APP_ASSETS_DIR / "favicon.png")
+    png_paths.append(APP_ASSETS_DIR / "favicon.png")
 
     launcher_sizes = {"mdpi": 48, "hdpi": 72, "xhdpi": 96, "xxhdpi": 144, "xxxhdpi": 192}
     foreground_sizes = {"mdpi": 108, "hdpi": 162, "xhdpi": 216, "xxhdpi": 324, "xxxhdpi": 432}
@@ -151,10 +156,11 @@ def sync_icon_assets(source_icon: Path) -> None:
     for density, size in splash_sizes.items():
         drawable_dir = ANDROID_RES_DIR / f"drawable-{density}"
         drawable_dir.mkdir(parents=True, exist_ok=True)
-        icon.resize((size, size), Image.Resampling.LANCZOS).save(
-            drawable_dir / "splashscreen_logo.png",
-            quality=95,
-        )
+        splash_path = drawable_dir / "splashscreen_logo.png"
+        icon.resize((size, size), Image.Resampling.LANCZOS).save(splash_path)
+        png_paths.append(splash_path)
+
+    return png_paths
 
 
 def parse_args() -> argparse.Namespace:
@@ -164,6 +170,7 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument("--pick", type=int, default=1, help="Candidate index to apply (1-based).")
     parser.add_argument("--prompt", type=str, default=DEFAULT_PROMPT, help="Icon generation prompt.")
     parser.add_argument("--skip-generate", action="store_true", help="Skip API generation and only apply an existing candidate.")
+    parser.add_argument("--skip-optimize", action="store_true", help="Sync icons without the PNG optimization pass.")
     return parser.parse_args()
 
 
@@ -184,7 +191,9 @@ def main() -> None:
         raise RuntimeError(f"--pick {pick_index} out of range (have {len(candidates)} candidates).")
 
     selected = candidates[pick_index - 1]
-    sync_icon_assets(selected)
+    synced_pngs = sync_icon_assets(selected)
+    if not args.skip_optimize:
+        optimize_assets(synced_pngs)
 
     print(f"Candidates: {CANDIDATE_DIR}")
     print(f"Applied: {selected}")
@@ -1,11 +1,32 @@
 #!/usr/bin/env python3
 from __future__ import annotations
 
+import argparse
+import contextlib
+import gc
+import gzip
 import hashlib
-from pathlib import Path
-from typing import Iterable, Tuple
-
-from PIL import Image, ImageDraw, ImageFilter, ImageFont
+import io
+import json
+import multiprocessing
+import os
+import re
+import resource
+import shutil
+import sys
+import tarfile
+import tempfile
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from functools import lru_cache, partial
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path, PurePosixPath
+from typing import Callable, Iterable, Tuple
+
+from PIL import Image, ImageChops, ImageDraw, ImageFilter, ImageFont
 
 
 ROOT = Path(__file__).resolve().parents[1]
@@ -26,12 +47,214 @@ ANDROID_ZH_SCREENSHOT_DIR = (
     ROOT / "fastlane" / "metadata" / "android" / "zh-CN" / "images" / "phoneScreenshots"
 )
 
+# Smallest blur radius kept after downsampling a glow layer; 0 always blurs at full size.
+GLOW_QUALITY_LEVELS = {"exact": 0, "balanced": 8, "draft": 4}
+GLOW_QUALITY = "balanced"
+# Rows of a glow tinted and composited at once, bounding its temporary layers.
+GLOW_STRIP_ROWS = 256
+# Max per-channel difference (after a 1px blur) a palette re-encode may introduce.
+ASSET_ERROR_BUDGET = 8
+# Runtime PNGs that ship in the app as written. The others are master art (the 1024
+# icons, Expo's splash and favicon sources, the iOS splash imageset) that Xcode and
+# Expo prebuild re-encode, so they are only recompressed losslessly.
+PALETTE_PNG_NAMES = {"splashscreen_logo.png"}
+SHARD_DIR = ROOT / "marketing" / "store-assets" / "shards"
+
+# Render service (--serve): default sizes per kind, limits and response content types.
+SERVICE_DEFAULT_SIZES = {"icon": 512, "share_card": (1200, 630)}
+SERVICE_MIN_SIDE = 16
+SERVICE_MAX_SIDE = 2048
+SERVICE_FORMATS = {"png": "image/png", "webp": "image/webp", "jpeg": "image/jpeg"}
+
+LAUNCHER_SIZES = {"mdpi": 48, "hdpi": 72, "xhdpi": 96, "xxhdpi": 144, "xxxhdpi": 192}
+FOREGROUND_SIZES = {"mdpi": 108, "hdpi": 162, "xhdpi": 216, "xxhdpi": 324, "xxxhdpi": 432}
+SPLASH_SIZES = {"mdpi": 288, "hdpi": 432, "xhdpi": 576, "xxhdpi": 864, "xxxhdpi": 1152}
+SCREEN_CROP_SIZE = (1170, 2532)
+RAW_SCREEN_PATTERN = "screen-*.png"
+RAW_SCREENS_MANIFEST_PATH = RAW_DIR / "screens.json"
+RAW_HASH_CACHE_PATH = RAW_DIR / ".hash-cache.json"
+HASH_CHUNK_SIZE = 1 << 20
+# Build timings and output fingerprints from previous runs, read by --plan.
+BUILD_STATS_PATH = ROOT / "marketing" / "store-assets" / ".build-stats.json"
+# Relative per-pixel encoder work; "optimize" is the max-effort zlib and palette trials.
+ENCODE_COSTS = {"png": 3.0, "webp": 6.0, "optimize": 300.0}
+# Seconds per cost unit used by --plan until timings have been recorded.
+DEFAULT_SECONDS_PER_COST = 5e-9
+# Decoded screenshot crops kept in memory at once (~9 MB each).
+SCREEN_BATCH_SIZE = 2
+_CROPPED_SCREENS: OrderedDict[Path, Image.Image] = OrderedDict()
+# Posters run per size, so one mockup serves every theme and locale of a screenshot.
+PHONE_MOCKUP_CACHE_SIZE = 1
+# Poster backgrounds kept in memory; set by size_render_caches().
+POSTER_BACKGROUND_CACHE_SIZE = 0
+# Resident set of one optimizer worker process while it recompresses the 1024 icon or
+# runs palette trials on the largest splash logo.
+OPTIMIZE_WORKER_MB = 100
+# Growth of the main process when it runs the same work itself, without a worker interpreter.
+OPTIMIZE_INPROCESS_MB = 40
+# Smallest --max-memory a build can meet: the main process peaks at about 132 MB while it
+# draws and encodes a 1290x2796 poster, even with every cache dropped.
+MIN_MEMORY_BUDGET_MB = 135
+# Set by --max-memory; caps cache residency and optimizer workers.
+MEMORY_BUDGET: "MemoryBudget | None" = None
+_PHONE_MOCKUPS: OrderedDict[Tuple[int, int, int], Tuple[Image.Image, Tuple[Image.Image, Image.Image]]] = OrderedDict()
+_POSTER_BACKGROUNDS: OrderedDict[Tuple["BrandTheme", Tuple[int, int], bool], Image.Image] = OrderedDict()
+
+# (file name, legacy fallback names, output key, {locale: (title, subtitle, badge)}).
+# "{wordmark}" / "{WORDMARK}" in copy is replaced with the theme's wordmark.
+KNOWN_SCREENS = [
+    (
+        "screen-world-map.png",
+        ("screen-home.png",),
+        "world_map",
+        {
+            "en": ("Agent World", "Explore your AI neighborhood", "{WORDMARK}"),
+            "zh": ("世界地图", "在 AI 社区中探索你的 Bot 世界", "{WORDMARK}"),
+        },
+    ),
+    (
+        "screen-mini-apps.png",
+        ("screen-town-map.png",),
+        "mini_apps",
+        {
+            "en": ("Mini App Builder", "Create and run apps from chat", "CREATE APP"),
+            "zh": ("Mini App 生成器", "在聊天中创建并运行应用", "创建应用"),
+        },
+    ),
+    (
+        "screen-team-chat.png",
+        (),
+        "team_chat",
+        {
+            "en": ("Team Collaboration", "Chat, tasks, and bot execution in one place", "TEAM CHAT"),
+            "zh": ("团队协作", "聊天、任务与 Bot 执行一体化", "团队聊天"),
+        },
+    ),
+]
+IOS_POSTER_SIZES = [(1290, 2796), (1242, 2688)]
+ANDROID_POSTER_SIZE = (1080, 1920)
+# Store upload limits: screenshots per size per locale (App Store), phone screenshots (Google Play).
+IOS_MAX_SCREENS = 10
+ANDROID_MAX_SCREENS = 8
+POSTER_DIRS = (IOS_SCREENSHOT_DIR_EN, IOS_SCREENSHOT_DIR_ZH, ANDROID_EN_SCREENSHOT_DIR, ANDROID_ZH_SCREENSHOT_DIR)
+# File names of generated posters: "01_world_map_1290x2796.png" (iOS) and "1.png" (Android).
+POSTER_NAME = re.compile(r"\d+(_\w+_\d+x\d+)?\.png")
+
+
+# Every color the brand artwork uses. Pairs of colors are (top, bottom) gradients;
+# "_dark"/"_light" keys are picked by background tone.
+DEFAULT_PALETTE: dict[str, tuple] = {
+    "accent": (34, 197, 94),
+    "mark_bg_dark": ((2, 10, 36), (8, 23, 66)),
+    "mark_bg_light": ((240, 247, 255), (228, 239, 252)),
+    "mark_border_dark": (74, 103, 171, 196),
+    "mark_border_light": (170, 194, 225, 196),
+    "mark_glow_primary_dark": (43, 223, 149, 95),
+    "mark_glow_primary_light": (52, 211, 153, 56),
+    "mark_glow_secondary_dark": (75, 158, 255, 70),
+    "mark_glow_secondary_light": (96, 165, 250, 52),
+    "mark_glow_tertiary_dark": (203, 35, 128, 72),
+    "mark_card_dark": (7, 23, 64, 238),
+    "mark_card_light": (248, 252, 255, 248),
+    "mark_card_inner_dark": (180, 220, 255, 38),
+    "mark_card_inner_light": (153, 176, 206, 62),
+    "symbol_line_dark": (246, 252, 255, 248),
+    "symbol_line_light": (22, 40, 77, 236),
+    "globe_glow_dark": (34, 197, 94, 130),
+    "globe_glow_light": (16, 185, 129, 90),
+    "globe_dark": ((88, 246, 178), (25, 190, 123)),
+    "globe_light": ((47, 219, 152), (20, 161, 109)),
+    "dot_glow": (32, 221, 136),
+    "dot": (34, 197, 94, 255),
+    "bubble_shadow": (8, 22, 44),
+    "bubble_dark": ((250, 252, 255), (226, 234, 246)),
+    "bubble_light": ((247, 250, 255), (222, 233, 246)),
+    "bubble_gloss": (204, 215, 232),
+    "poster_bg_dark": ((7, 9, 34), (22, 24, 48)),
+    "poster_bg_light": ((240, 247, 255), (228, 244, 232)),
+    "poster_glow_primary": (34, 197, 94, 82),
+    "poster_glow_secondary": (59, 130, 246, 75),
+    "poster_title_dark": (247, 250, 255, 255),
+    "poster_title_light": (15, 23, 42, 255),
+    "poster_subtitle_dark": (190, 204, 224, 255),
+    "poster_subtitle_light": (71, 85, 105, 255),
+    "poster_badge_text": (12, 22, 28, 255),
+    "feature_bg": ((8, 13, 36), (23, 20, 47)),
+    "feature_glow_primary": (34, 197, 94, 95),
+    "feature_glow_secondary": (220, 38, 127, 85),
+    "feature_title": (245, 249, 255, 255),
+    "feature_subtitle": (180, 196, 218, 255),
+    "logo_bg_dark": ((10, 16, 34), (17, 23, 42)),
+    "logo_bg_light": ((247, 250, 255), (234, 242, 252)),
+    "logo_glow": (34, 197, 94, 45),
+    "logo_title_dark": (242, 247, 255, 255),
+    "logo_title_light": (11, 23, 41, 255),
+    "logo_subtitle_dark": (168, 184, 208, 255),
+    "logo_subtitle_light": (71, 85, 105, 255),
+}
+
+
+@dataclass(frozen=True, eq=False)
+class BrandTheme:
+    """A white-label brand: copy, palette and where its outputs go.
+
+    ``output_root`` mirrors the repo layout, so the default theme (rooted at ROOT)
+    writes exactly the paths it always has. Themes hash by identity so per-theme
+    renders can be memoized.
+    """
+
+    name: str = "agenttown"
+    wordmark: str = "AgentTown"
+    tagline: str = "Chat-driven Mini Apps for AI Teams"
+    feature_tagline: str = "Chat-driven AI Mini Apps"
+    logo_badge: str = "AI WORLD"
+    palette: dict[str, tuple] = field(default_factory=lambda: dict(DEFAULT_PALETTE))
+    output_root: Path = ROOT
+
+    def path(self, path: Path) -> Path:
+        return self.output_root / path.relative_to(ROOT)
+
+    def text(self, value: str) -> str:
+        return value.replace("{wordmark}", self.wordmark).replace("{WORDMARK}", self.wordmark.upper())
+
+    def target_name(self, name: str) -> str:
+        return name if self.name == DEFAULT_THEME_NAME else f"{self.name}/{name}"
+
+
+DEFAULT_THEME_NAME = "agenttown"
+DEFAULT_THEME = BrandTheme()
+THEMES_DIR = ROOT / "marketing" / "store-assets" / "themes"
+# Theme names end up in file names, target names and output roots.
+THEME_NAME = re.compile(r"[\w-]+")
+BRANDS_OUT_DIR = ROOT / "marketing" / "store-assets" / "brands"
+
+
+@dataclass(frozen=True)
+class BuildTarget:
+    """One independently renderable unit of the build.
+
+    ``render`` writes ``outputs`` (paths under ROOT). ``cost`` is a relative estimate in
+    processed pixels, used for sharding and --plan. ``inputs`` are source files whose
+    contents the outputs depend on.
+    """
+
+    name: str
+    outputs: Tuple[Path, ...]
+    cost: float
+    render: Callable[[], None]
+    inputs: Tuple[Path, ...] = ()
+
 
 def ensure_dirs(paths: Iterable[Path]) -> None:
     for path in paths:
         path.mkdir(parents=True, exist_ok=True)
 
 
+def display_path(path: Path) -> str:
+    return str(path.relative_to(ROOT)) if path.is_relative_to(ROOT) else str(path)
+
+
+@lru_cache(maxsize=None)
 def find_font(size: int, bold: bool = False) -> ImageFont.FreeTypeFont | ImageFont.ImageFont:
     candidates = [
         "/System/Library/Fonts/PingFang.ttc",
@@ -57,6 +280,7 @@ def gradient(size: Tuple[int, int], top: Tuple[int, int, int], bottom: Tuple[int
     return canvas
 
 
+@lru_cache(maxsize=32)
 def rounded_mask(size: Tuple[int, int], radius: int) -> Image.Image:
     mask = Image.new("L", size, 0)
     draw = ImageDraw.Draw(mask)
@@ -64,17 +288,137 @@ def rounded_mask(size: Tuple[int, int], radius: int) -> Image.Image:
     return mask
 
 
+@lru_cache(maxsize=32)
+def ellipse_mask(size: Tuple[int, int]) -> Image.Image:
+    mask = Image.new("L", size, 0)
+    ImageDraw.Draw(mask).ellipse((0, 0, size[0] - 1, size[1] - 1), fill=255)
+    return mask
+
+
+def glow_blur(layer: Image.Image, radius: float, quality: str | None = None) -> Image.Image:
+    """Gaussian-blur a mostly transparent glow/shadow layer.
+
+    Only the painted region (plus the blur support) is processed, so this is exact
+    for every quality level up to that crop. For large radii the crop is box-reduced
+    by ``radius // GLOW_QUALITY_LEVELS[quality]``, blurred at low resolution and
+    bicubic-upsampled; "exact" always blurs at full size and matches
+    ``ImageFilter.GaussianBlur`` on the layer.
+
+    Final images also carry the rounding of composite_glow, which tints blurred masks.
+    Against painting and blurring full color layers, the maximum per-channel error on
+    opaque pixels of the logos, posters, feature graphic and runtime icons is 3/255
+    for "exact" and "balanced" and 4/255 for "draft". Semi-transparent edge pixels of
+    the RGBA brand marks differ by up to 7/255 at every level.
+    """
+    quality = quality or GLOW_QUALITY
+    alpha = layer.getchannel("A") if layer.mode == "RGBA" else layer
+    painted = alpha.getbbox()
+    if painted is None:
+        return layer.copy()
+
+    # PIL's Gaussian is three box passes whose support stays within 3 * radius.
+    pad = int(radius * 3) + 2
+    width, height = layer.size
+    box = (
+        max(0, painted[0] - pad),
+        max(0, painted[1] - pad),
+        min(width, painted[2] + pad),
+        min(height, painted[3] + pad),
+    )
+    region = layer.crop(box)
+
+    min_radius = GLOW_QUALITY_LEVELS[quality]
+    factor = int(radius // min_radius) if min_radius else 1
+    if factor < 2:
+        region = region.filter(ImageFilter.GaussianBlur(radius=radius))
+    else:
+        region_w, region_h = region.size
+        small = region.reduce(factor).filter(ImageFilter.GaussianBlur(radius=radius / factor))
+        region = small.resize(
+            region.size,
+            Image.Resampling.BICUBIC,
+            box=(0, 0, region_w / factor, region_h / factor),
+        )
+
+    blurred = Image.new(layer.mode, layer.size, 0)
+    blurred.paste(region, box[:2])
+    return blurred
+
+
+@lru_cache(maxsize=48)
+def blurred_ellipse_masks(
+    size: Tuple[int, int],
+    bboxes: Tuple[Tuple[int, int, int, int], ...],
+    blur: int,
+    quality: str,
+) -> Tuple[Tuple[int, int, int, int] | None, Tuple[Image.Image, ...]]:
+    """Blurred coverage masks for ellipses painted in order onto one layer.
+
+    Later ellipses hide earlier ones, as on a single painted layer. The masks only
+    depend on geometry, so every theme and every poster of one size reuses them.
+    They are cropped to the box where any of them is non-zero, returned first.
+    """
+    masks = []
+    covered = Image.new("L", size, 0)
+    for bbox in reversed(bboxes):
+        shape = Image.new("L", size, 0)
+        ImageDraw.Draw(shape).ellipse(bbox, fill=255)
+        masks.append(glow_blur(ImageChops.subtract(shape, covered), blur, quality))
+        covered = ImageChops.lighter(covered, shape)
+    painted = [box for box in (mask.getbbox() for mask in masks) if box]
+    if not painted:
+        return None, ()
+    box = (
+        min(item[0] for item in painted),
+        min(item[1] for item in painted),
+        max(item[2] for item in painted),
+        max(item[3] for item in painted),
+    )
+    return box, tuple(mask.crop(box) for mask in reversed(masks))
+
+
+def glow_layer(masks: Iterable[Image.Image], colors: Iterable[Tuple[int, int, int, int]]) -> Image.Image:
+    """Blurred RGBA layer of colored ellipses, tinted from their blurred coverage masks.
+
+    Blurring is linear, so tinting a blurred coverage mask matches blurring the painted
+    layer up to rounding (see glow_blur for the error on final images).
+    """
+    layer = None
+    for mask, color in zip(masks, colors):
+        tinted = Image.merge("RGBA", [mask.point([(value * channel + 127) // 255 for value in range(256)]) for channel in color])
+        layer = tinted if layer is None else ImageChops.add(layer, tinted)
+    return layer
+
+
+def composite_glow(
+    canvas: Image.Image,
+    ellipses: Iterable[Tuple[Tuple[int, int, int, int], Tuple[int, int, int, int]]],
+    blur: int,
+) -> None:
+    """alpha_composite blurred colored ellipses onto ``canvas`` in place.
+
+    Only the masks' painted box is touched, GLOW_STRIP_ROWS rows at a time, so no
+    full-canvas glow layer is ever allocated. Every step is per-pixel, so the result
+    matches compositing one full layer.
+    """
+    ellipses = list(ellipses)
+    box, masks = blurred_ellipse_masks(canvas.size, tuple(bbox for bbox, _ in ellipses), blur, GLOW_QUALITY)
+    if box is None:
+        return
+    colors = [color for _, color in ellipses]
+    width, height = masks[0].size
+    for top in range(0, height, GLOW_STRIP_ROWS):
+        strip = (0, top, width, min(height, top + GLOW_STRIP_ROWS))
+        canvas.alpha_composite(glow_layer([mask.crop(strip) for mask in masks], colors), (box[0], box[1] + top))
+
+
 def add_blurred_ellipse(
     canvas: Image.Image,
     bbox: Tuple[int, int, int, int],
     color: Tuple[int, int, int, int],
     blur: int,
 ) -> None:
-    layer = Image.new("RGBA", canvas.size, (0, 0, 0, 0))
-    draw = ImageDraw.Draw(layer)
-    draw.ellipse(bbox, fill=color)
-    layer = layer.filter(ImageFilter.GaussianBlur(radius=blur))
-    canvas.alpha_composite(layer)
+    composite_glow(canvas, [(bbox, color)], blur)
 
 
 def draw_world_chat_symbol(
@@ -83,9 +427,11 @@ def draw_world_chat_symbol(
     center_y: int,
     icon_size: int,
     dark_bg: bool,
+    palette: dict[str, tuple] = DEFAULT_PALETTE,
 ) -> None:
+    tone = "dark" if dark_bg else "light"
     draw = ImageDraw.Draw(canvas)
-    line_color = (246, 252, 255, 248) if dark_bg else (22, 40, 77, 236)
+    line_color = palette[f"symbol_line_{tone}"]
     stroke = max(6, icon_size // 52)
 
     globe_r = int(icon_size * 0.39)
@@ -102,16 +448,13 @@ def draw_world_chat_symbol(
             globe_left + globe_size + int(globe_r * 0.35),
             globe_top + globe_size + int(globe_r * 0.45),
         ),
-        (34, 197, 94, 130) if dark_bg else (16, 185, 129, 90),
+        palette[f"globe_glow_{tone}"],
         blur=max(16, icon_size // 12),
     )
 
-    globe_top_color = (88, 246, 178) if dark_bg else (47, 219, 152)
-    globe_bottom_color = (25, 190, 123) if dark_bg else (20, 161, 109)
+    globe_top_color, globe_bottom_color = palette[f"globe_{tone}"]
     globe = gradient((globe_size, globe_size), globe_top_color, globe_bottom_color).convert("RGBA")
-    globe_mask = Image.new("L", (globe_size, globe_size), 0)
-    ImageDraw.Draw(globe_mask).ellipse((0, 0, globe_size - 1, globe_size - 1), fill=255)
-    globe.putalpha(globe_mask)
+    globe.putalpha(ellipse_mask((globe_size, globe_size)))
 
     gloss = Image.new("RGBA", (globe_size, globe_size), (0, 0, 0, 0))
     gloss_draw = ImageDraw.Draw(gloss)
@@ -124,7 +467,7 @@ def draw_world_chat_symbol(
         ),
         fill=(255, 255, 255, 62 if dark_bg else 46),
     )
-    gloss = gloss.filter(ImageFilter.GaussianBlur(radius=max(6, icon_size // 58)))
+    gloss = glow_blur(gloss, max(6, icon_size // 58))
     globe = Image.alpha_composite(globe, gloss)
     canvas.alpha_composite(globe, (globe_left, globe_top))
 
@@ -165,12 +508,12 @@ def draw_world_chat_symbol(
     add_blurred_ellipse(
         canvas,
         (dot_x - dot_r * 3, dot_y - dot_r * 3, dot_x + dot_r * 3, dot_y + dot_r * 3),
-        (32, 221, 136, 128 if dark_bg else 90),
+        palette["dot_glow"] + (128 if dark_bg else 90,),
         blur=max(6, icon_size // 84),
     )
     draw.ellipse(
         (dot_x - dot_r, dot_y - dot_r, dot_x + dot_r, dot_y + dot_r),
-        fill=(34, 197, 94, 255),
+        fill=palette["dot"],
         outline=(255, 255, 255, 248),
         width=max(2, stroke // 3),
     )
@@ -193,7 +536,7 @@ def draw_world_chat_symbol(
             bubble_y + bubble_h + shadow_offset + 1,
         ),
         radius=bubble_radius,
-        fill=(8, 22, 44, 120 if dark_bg else 72),
+        fill=palette["bubble_shadow"] + (120 if dark_bg else 72,),
     )
     shadow_draw.polygon(
         [
@@ -204,15 +547,14 @@ def draw_world_chat_symbol(
                 bubble_y + bubble_h + bubble_tail_h - int(icon_size * 0.01) + 1,
             ),
         ],
-        fill=(8, 22, 44, 120 if dark_bg else 72),
+        fill=palette["bubble_shadow"] + (120 if dark_bg else 72,),
     )
-    shadow_layer = shadow_layer.filter(ImageFilter.GaussianBlur(radius=max(8, icon_size // 64)))
+    shadow_layer = glow_blur(shadow_layer, max(8, icon_size // 64))
     canvas.alpha_composite(shadow_layer)
 
     bubble = Image.new("RGBA", (bubble_w, bubble_h + bubble_tail_h), (0, 0, 0, 0))
     bubble_draw = ImageDraw.Draw(bubble)
-    top_color = (250, 252, 255) if dark_bg else (247, 250, 255)
-    bottom_color = (226, 234, 246) if dark_bg else (222, 233, 246)
+    top_color, bottom_color = palette[f"bubble_{tone}"]
     for y in range(bubble_h):
         t = y / max(1, bubble_h - 1)
         bubble_line = tuple(int(top_color[i] * (1 - t) + bottom_color[i] * t) for i in range(3)) + (255,)
@@ -244,51 +586,51 @@ def draw_world_chat_symbol(
     gloss_draw.rounded_rectangle(
         (int(bubble_w * 0.08), int(bubble_h * 0.20), int(bubble_w * 0.92), int(bubble_h * 0.34)),
         radius=max(6, bubble_h // 16),
-        fill=(204, 215, 232, 145 if dark_bg else 118),
+        fill=palette["bubble_gloss"] + (145 if dark_bg else 118,),
     )
-    gloss_overlay = gloss_overlay.filter(ImageFilter.GaussianBlur(radius=max(4, icon_size // 140)))
+    gloss_overlay = glow_blur(gloss_overlay, max(4, icon_size // 140))
     bubble = Image.alpha_composite(bubble, gloss_overlay)
     canvas.alpha_composite(bubble, (bubble_x, bubble_y))
 
 
-def draw_brand_mark(size: int = 1024, dark_bg: bool = True, mode: str = "card") -> Image.Image:
-    if dark_bg:
-        bg_start, bg_end = (2, 10, 36), (8, 23, 66)
-        border_color = (74, 103, 171, 196)
-    else:
-        bg_start, bg_end = (240, 247, 255), (228, 239, 252)
-        border_color = (170, 194, 225, 196)
+def draw_brand_background(
+    size: int = 1024,
+    dark_bg: bool = True,
+    mode: str = "card",
+    palette: dict[str, tuple] = DEFAULT_PALETTE,
+) -> Image.Image:
+    """The brand mark without its symbol: gradient, glows and (in card mode) the card."""
+    tone = "dark" if dark_bg else "light"
+    bg_start, bg_end = palette[f"mark_bg_{tone}"]
+    border_color = palette[f"mark_border_{tone}"]
 
     base = gradient((size, size), bg_start, bg_end).convert("RGBA")
 
     add_blurred_ellipse(
         base,
         (int(size * 0.15), int(size * -0.18), int(size * 0.92), int(size * 0.52)),
-        (43, 223, 149, 95) if dark_bg else (52, 211, 153, 56),
+        palette[f"mark_glow_primary_{tone}"],
         blur=max(36, size // 8),
     )
     add_blurred_ellipse(
         base,
         (int(size * -0.24), int(size * 0.46), int(size * 0.44), int(size * 1.14)),
-        (75, 158, 255, 70) if dark_bg else (96, 165, 250, 52),
+        palette[f"mark_glow_secondary_{tone}"],
         blur=max(40, size // 8),
     )
     if dark_bg:
         add_blurred_ellipse(
             base,
             (int(size * 0.36), int(size * 0.60), int(size * 1.08), int(size * 1.24)),
-            (203, 35, 128, 72),
+            palette["mark_glow_tertiary_dark"],
             blur=max(48, size // 8),
         )
 
-    center = size // 2
-    symbol_size = int(size * (0.58 if mode == "card" else 0.64))
-
     if mode == "card":
         draw = ImageDraw.Draw(base)
         pad = int(size * 0.07)
         radius = int(size * 0.23)
-        card_color = (7, 23, 64, 238) if dark_bg else (248, 252, 255, 248)
+        card_color = palette[f"mark_card_{tone}"]
         draw.rounded_rectangle(
             (pad, pad, size - pad, size - pad),
             radius=radius,
@@ -299,40 +641,72 @@ def draw_brand_mark(size: int = 1024, dark_bg: bool = True, mode: str = "card")
         draw.rounded_rectangle(
             (pad + 3, pad + 3, size - pad - 3, size - pad - 3),
             radius=max(6, radius - 3),
-            outline=(180, 220, 255, 38) if dark_bg else (153, 176, 206, 62),
+            outline=palette[f"mark_card_inner_{tone}"],
             width=max(1, size // 512),
         )
-        symbol_size = int(size * 0.56)
-
-    draw_world_chat_symbol(base, center, center, symbol_size, dark_bg=dark_bg)
 
     return base
 
 
-def generate_runtime_icons() -> None:
-    ensure_dirs([APP_ASSETS_DIR, IOS_SPLASH_LEGACY_DIR, ANDROID_IMAGES_DIR])
-    icon_1024 = draw_brand_mark(size=1024, dark_bg=True, mode="plain").convert("RGB")
-    icon_1024.save(APP_ASSETS_DIR / "icon.png", quality=95)
-    icon_1024.save(APP_ASSETS_DIR / "adaptive-icon.png", quality=95)
-    icon_1024.save(APP_ASSETS_DIR / "splash-icon.png", quality=95)
-    icon_1024.resize((48, 48), Image.Resampling.LANCZOS).save(APP_ASSETS_DIR / "favicon.png")
-    icon_1024.save(IOS_APP_ICON_PATH, quality=95)
-    for splash_name in ("image.png", "image@2x.png", "image@3x.png"):
-        icon_1024.save(IOS_SPLASH_LEGACY_DIR / splash_name, quality=95)
+def draw_brand_mark(
+    size: int = 1024,
+    dark_bg: bool = True,
+    mode: str = "card",
+    palette: dict[str, tuple] = DEFAULT_PALETTE,
+) -> Image.Image:
+    base = draw_brand_background(size, dark_bg, mode, palette)
+    center = size // 2
+    symbol_size = int(size * (0.56 if mode == "card" else 0.64))
+    draw_world_chat_symbol(base, center, center, symbol_size, dark_bg=dark_bg, palette=palette)
+    return base
 
-    launcher_sizes = {"mdpi": 48, "hdpi": 72, "xhdpi": 96, "xxhdpi": 144, "xxxhdpi": 192}
-    foreground_sizes = {"mdpi": 108, "hdpi": 162, "xhdpi": 216, "xxhdpi": 324, "xxxhdpi": 432}
-    splash_sizes = {"mdpi": 288, "hdpi": 432, "xhdpi": 576, "xxhdpi": 864, "xxxhdpi": 1152}
 
-    for density, px in launcher_sizes.items():
-        mipmap_dir = ANDROID_RES_DIR / f"mipmap-{density}"
+def runtime_icon_outputs(theme: BrandTheme = DEFAULT_THEME) -> list[Path]:
+    outputs = [
+        APP_ASSETS_DIR / "icon.png",
+        APP_ASSETS_DIR / "adaptive-icon.png",
+        APP_ASSETS_DIR / "splash-icon.png",
+        APP_ASSETS_DIR / "favicon.png",
+        IOS_APP_ICON_PATH,
+    ]
+    outputs.extend(IOS_SPLASH_LEGACY_DIR / name for name in ("image.png", "image@2x.png", "image@3x.png"))
+    for density in LAUNCHER_SIZES:
+        outputs.append(ANDROID_RES_DIR / f"mipmap-{density}" / "ic_launcher.webp")
+        outputs.append(ANDROID_RES_DIR / f"mipmap-{density}" / "ic_launcher_round.webp")
+    for density in FOREGROUND_SIZES:
+        outputs.append(ANDROID_RES_DIR / f"mipmap-{density}" / "ic_launcher_foreground.webp")
+    for density in SPLASH_SIZES:
+        outputs.append(ANDROID_RES_DIR / f"drawable-{density}" / "splashscreen_logo.png")
+    return [theme.path(path) for path in outputs]
+
+
+def generate_runtime_icons(theme: BrandTheme = DEFAULT_THEME) -> list[Path]:
+    app_assets_dir = theme.path(APP_ASSETS_DIR)
+    ios_splash_dir = theme.path(IOS_SPLASH_LEGACY_DIR)
+    android_res_dir = theme.path(ANDROID_RES_DIR)
+    ensure_dirs([app_assets_dir, ios_splash_dir, theme.path(IOS_APP_ICON_PATH.parent)])
+    icon_1024 = cached_brand_mark(theme, 1024, True, "plain").convert("RGB")
+    png_paths = [
+        app_assets_dir / "icon.png",
+        app_assets_dir / "adaptive-icon.png",
+        app_assets_dir / "splash-icon.png",
+        theme.path(IOS_APP_ICON_PATH),
+    ]
+    png_paths.extend(ios_splash_dir / name for name in ("image.png", "image@2x.png", "image@3x.png"))
+    for path in png_paths:
+        icon_1024.save(path)
+    icon_1024.resize((48, 48), Image.Resampling.LANCZOS).save(app_assets_dir / "favicon.png")
+    png_paths.append(app_assets_dir / "favicon.png")
+
+    for density, px in LAUNCHER_SIZES.items():
+        mipmap_dir = android_res_dir / f"mipmap-{density}"
         ensure_dirs([mipmap_dir])
         resized = icon_1024.resize((px, px), Image.Resampling.LANCZOS)
         resized.save(mipmap_dir / "ic_launcher.webp", format="WEBP", quality=95, method=6)
         resized.save(mipmap_dir / "ic_launcher_round.webp", format="WEBP", quality=95, method=6)
 
-    for density, px in foreground_sizes.items():
-        mipmap_dir = ANDROID_RES_DIR / f"mipmap-{density}"
+    for density, px in FOREGROUND_SIZES.items():
+        mipmap_dir = android_res_dir / f"mipmap-{density}"
         ensure_dirs([mipmap_dir])
         icon_1024.resize((px, px), Image.Resampling.LANCZOS).save(
             mipmap_dir / "ic_launcher_foreground.webp",
@@ -341,49 +715,238 @@ def generate_runtime_icons() -> None:
             method=6,
         )
 
-    for density, px in splash_sizes.items():
-        drawable_dir = ANDROID_RES_DIR / f"drawable-{density}"
+    for density, px in SPLASH_SIZES.items():
+        drawable_dir = android_res_dir / f"drawable-{density}"
         ensure_dirs([drawable_dir])
-        icon_1024.resize((px, px), Image.Resampling.LANCZOS).save(
-            drawable_dir / "splashscreen_logo.png",
-            quality=95,
-        )
+        splash_path = drawable_dir / "splashscreen_logo.png"
+        icon_1024.resize((px, px), Image.Resampling.LANCZOS).save(splash_path)
+        png_paths.append(splash_path)
+
+    return png_paths
+
+
+def build_runtime_icons(
+    theme: BrandTheme = DEFAULT_THEME,
+    optimize: bool = True,
+    jobs: int | None = None,
+    error_budget: int = ASSET_ERROR_BUDGET,
+) -> None:
+    """Write runtime icons, then optimize them unless ``optimize`` is false."""
+    runtime_pngs = generate_runtime_icons(theme)
+    if optimize:
+        optimize_assets(runtime_pngs, jobs=jobs, error_budget=error_budget)
+
+
+def perceptual_error(reference: Image.Image, candidate: Image.Image) -> int:
+    """Largest per-channel difference after a 1px blur, which hides single-pixel dither noise."""
+    soften = ImageFilter.GaussianBlur(radius=1)
+    diff = ImageChops.difference(reference.filter(soften), candidate.convert(reference.mode).filter(soften))
+    return max(high for _, high in diff.getextrema())
+
+
+def encode_image(image: Image.Image, image_format: str, **params) -> bytes:
+    buffer = io.BytesIO()
+    image.save(buffer, format=image_format, **params)
+    return buffer.getvalue()
+
+
+def optimize_png_file(path: Path, error_budget: int, allow_palette: bool) -> Tuple[Path, int, int, str]:
+    """Rewrite ``path`` with the smallest PNG, trying palettes within ``error_budget`` if allowed.
+
+    Returns a report row of (path, bytes before, bytes after, method).
+    """
+    original = path.read_bytes()
+    with Image.open(io.BytesIO(original)) as opened:
+        reference = opened.convert("RGBA" if "A" in opened.getbands() else "RGB")
+
+    best, best_method = original, "original"
+    lossless = encode_image(reference, "PNG", optimize=True, compress_level=9)
+    if len(lossless) < len(best):
+        best, best_method = lossless, "zlib-9"
+
+    # MEDIANCUT and MAXCOVERAGE only support RGB input.
+    methods = [Image.Quantize.FASTOCTREE] if allow_palette else []
+    if allow_palette and reference.mode == "RGB":
+        methods = [Image.Quantize.MAXCOVERAGE, Image.Quantize.MEDIANCUT, *methods]
+    for method in methods:
+        palette = reference.quantize(256, method=method)
+        if perceptual_error(reference, palette) > error_budget:
+            continue
+        encoded = encode_image(palette, "PNG", optimize=True, compress_level=9)
+        if len(encoded) < len(best):
+            best, best_method = encoded, f"palette-{method.name.lower()}"
+
+    if best is not original:
+        temp_path = path.with_suffix(path.suffix + ".tmp")
+        temp_path.write_bytes(best)
+        temp_path.replace(path)
+    return path, len(original), len(best), best_method
+
+
+def optimize_assets(
+    paths: Iterable[Path],
+    jobs: int | None = None,
+    error_budget: int = ASSET_ERROR_BUDGET,
+) -> None:
+    """Recompress PNG assets in parallel and print a per-file size report.
+
+    Byte-identical inputs are optimized once and the result copied to the duplicates.
+    Only files named in PALETTE_PNG_NAMES may become palette PNGs.
+    """
+    by_digest: dict[str, list[Path]] = {}
+    for path in paths:
+        by_digest.setdefault(file_sha1(path), []).append(path)
+
+    rows: list[Tuple[Path, int, int, str]] = []
+    mp_context = None
+    if MEMORY_BUDGET is not None:
+        jobs = MEMORY_BUDGET.optimizer_plan(jobs)
+        # Spawned workers start small instead of inheriting the parent's pages.
+        mp_context = multiprocessing.get_context("spawn")
+    work = [(group, all(path.name in PALETTE_PNG_NAMES for path in group)) for group in by_digest.values()]
+    with contextlib.ExitStack() as stack:
+        if jobs == 0:
+            # Too little memory left for a worker process: optimize here, one file at a time.
+            results = ((group, optimize_png_file(group[0], error_budget, palette)) for group, palette in work)
+        else:
+            pool = stack.enter_context(ProcessPoolExecutor(max_workers=jobs, mp_context=mp_context))
+            futures = {pool.submit(optimize_png_file, group[0], error_budget, palette): group for group, palette in work}
+            results = ((futures[future], future.result()) for future in as_completed(futures))
+        for group, primary_row in results:
+            rows.append(primary_row)
+            _, before, after, method = primary_row
+            for duplicate in group[1:]:
+                shutil.copyfile(group[0], duplicate)
+                rows.append((duplicate, before, after, f"{method}, copy of {group[0].name}"))
+
+    total_before = total_after = 0
+    print("Asset optimization:")
+    for path, before, after, method in sorted(rows, key=lambda row: str(row[0])):
+        saved = 100 * (before - after) / max(1, before)
+        print(f"- {display_path(path)}: {before:,} -> {after:,} bytes ({saved:.1f}% smaller, {method})")
+        total_before += before
+        total_after += after
+    print(f"- PNG total: {total_before:,} -> {total_after:,} bytes")
+
+
+@lru_cache(maxsize=8)
+def cached_brand_mark(theme: BrandTheme, size: int, dark_bg: bool, mode: str) -> Image.Image:
+    """Memoized draw_brand_mark; callers must not draw onto the returned image."""
+    return draw_brand_mark(size=size, dark_bg=dark_bg, mode=mode, palette=theme.palette)
+
+
+def save_brand_mark(
+    output_path: Path,
+    size: int,
+    dark_bg: bool,
+    mode: str,
+    rgb: bool = False,
+    theme: BrandTheme = DEFAULT_THEME,
+) -> None:
+    mark = cached_brand_mark(theme, size, dark_bg, mode)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    if rgb:
+        mark.convert("RGB").save(output_path, quality=95)
+    else:
+        mark.save(output_path)
+
+
+def create_horizontal_logo(output_path: Path, is_dark: bool, theme: BrandTheme = DEFAULT_THEME) -> None:
+    palette = theme.palette
+    tone = "dark" if is_dark else "light"
+    width, height = 2048, 640
+    bg = gradient((width, height), *palette[f"logo_bg_{tone}"])
+    bg = bg.convert("RGBA")
+    composite_glow(bg, [((width - 520, 110, width - 120, 510), palette["logo_glow"])], 44)
+
+    mark = cached_brand_mark(theme, 420, is_dark, "card")
+    bg.alpha_composite(mark, (120, (height - 420) // 2))
+
+    draw = ImageDraw.Draw(bg)
+    title_font = find_font(126, bold=True)
+    subtitle_font = find_font(42, bold=False)
+    title_color = palette[f"logo_title_{tone}"]
+    subtitle_color = palette[f"logo_subtitle_{tone}"]
+    accent = palette["accent"] + (255,)
+    draw.text((600, 196), theme.wordmark, font=title_font, fill=title_color)
+    draw.text((600, 340), theme.tagline, font=subtitle_font, fill=subtitle_color)
+    badge_font = find_font(30, bold=True)
+    badge_w = max(235, int(draw.textlength(theme.logo_badge, font=badge_font)) + 60)
+    draw.rounded_rectangle((600, 126, 600 + badge_w, 171), radius=22, fill=palette["accent"] + (32,))
+    draw.text((630, 130), theme.logo_badge, font=badge_font, fill=accent)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    bg.convert("RGB").save(output_path, quality=95)
+
+
+def blur_cost(area: float, radius: float) -> float:
+    """Relative work of glow_blur over ``area`` pixels at the current GLOW_QUALITY."""
+    min_radius = GLOW_QUALITY_LEVELS[GLOW_QUALITY]
+    factor = int(radius // min_radius) if min_radius else 1
+    if factor < 2:
+        # Three box passes, each horizontal and vertical.
+        return area * 6.0
+    # Box reduce, blur at 1/factor^2 of the pixels, bicubic upsample.
+    return area * (3.0 + 6.0 / (factor * factor))
+
+
+def encode_cost(area: float, setting: str) -> float:
+    return area * ENCODE_COSTS[setting]
 
 
-def draw_logo_variants() -> None:
-    ensure_dirs([LOGO_DIR])
+def brand_mark_cost(size: int) -> float:
+    # Gradient and card, three background glows, then the symbol's halo, gloss and shadow.
+    area = size * size
+    symbol = size * 0.6
+    return (
+        area * 2.0
+        + 3 * blur_cost(area, max(36, size // 8))
+        + blur_cost(area * 0.6, max(6, symbol // 58))
+        + 2 * blur_cost(symbol * symbol * 0.5, max(8, symbol // 64))
+    )
+
 
-    mark_dark = draw_brand_mark(size=1024, dark_bg=True, mode="card")
-    mark_light = draw_brand_mark(size=1024, dark_bg=False, mode="card")
-    mark_dark.save(LOGO_DIR / "agenttown-logo-mark-dark-1024.png")
-    mark_light.save(LOGO_DIR / "agenttown-logo-mark-light-1024.png")
+def horizontal_logo_cost() -> float:
+    area = 2048 * 640
+    return area * 3.0 + blur_cost(area * 0.2, 44) + brand_mark_cost(420) + encode_cost(area, "png")
 
-    for theme_name, is_dark in [("dark", True), ("light", False)]:
-        width, height = 2048, 640
-        bg = gradient((width, height), (10, 16, 34), (17, 23, 42)) if is_dark else gradient((width, height), (247, 250, 255), (234, 242, 252))
-        overlay = Image.new("RGBA", (width, height), (0, 0, 0, 0))
-        o_draw = ImageDraw.Draw(overlay)
-        o_draw.ellipse((width - 520, 110, width - 120, 510), fill=(34, 197, 94, 45))
-        overlay = overlay.filter(ImageFilter.GaussianBlur(radius=44))
-        bg = Image.alpha_composite(bg.convert("RGBA"), overlay)
 
-        mark = draw_brand_mark(size=420, dark_bg=is_dark, mode="card")
-        bg.alpha_composite(mark, (120, (height - 420) // 2))
+def logo_targets(theme: BrandTheme = DEFAULT_THEME) -> list[BuildTarget]:
+    logo_dir = theme.path(LOGO_DIR)
+    targets = []
+    for tone, is_dark in [("dark", True), ("light", False)]:
+        mark_path = logo_dir / f"{theme.name}-logo-mark-{tone}-1024.png"
+        targets.append(
+            BuildTarget(
+                theme.target_name(f"logo/mark-{tone}"),
+                (mark_path,),
+                brand_mark_cost(1024) + encode_cost(1024 * 1024, "png"),
+                partial(save_brand_mark, mark_path, 1024, is_dark, "card", theme=theme),
+            )
+        )
+    for tone, is_dark in [("dark", True), ("light", False)]:
+        logo_path = logo_dir / f"{theme.name}-logo-horizontal-{tone}-2048x640.png"
+        targets.append(
+            BuildTarget(
+                theme.target_name(f"logo/horizontal-{tone}"),
+                (logo_path,),
+                horizontal_logo_cost(),
+                partial(create_horizontal_logo, logo_path, is_dark, theme),
+            )
+        )
+    play_icon_path = theme.path(OUT_ROOT) / f"{theme.name}-play-icon-512.png"
+    targets.append(
+        BuildTarget(
+            theme.target_name("logo/play-icon"),
+            (play_icon_path,),
+            brand_mark_cost(512) + encode_cost(512 * 512, "png"),
+            partial(save_brand_mark, play_icon_path, 512, True, "plain", rgb=True, theme=theme),
+        )
+    )
+    return targets
 
-        draw = ImageDraw.Draw(bg)
-        title_font = find_font(126, bold=True)
-        subtitle_font = find_font(42, bold=False)
-        title_color = (242, 247, 255, 255) if is_dark else (11, 23, 41, 255)
-        subtitle_color = (168, 184, 208, 255) if is_dark else (71, 85, 105, 255)
-        accent = (34, 197, 94, 255)
-        draw.text((600, 196), "AgentTown", font=title_font, fill=title_color)
-        draw.text((600, 340), "Chat-driven Mini Apps for AI Teams", font=subtitle_font, fill=subtitle_color)
-        draw.rounded_rectangle((600, 126, 835, 171), radius=22, fill=(34, 197, 94, 32))
-        draw.text((630, 130), "AI WORLD", font=find_font(30, bold=True), fill=accent)
-        bg.convert("RGB").save(LOGO_DIR / f"agenttown-logo-horizontal-{theme_name}-2048x640.png", quality=95)
 
-    app_icon = draw_brand_mark(size=512, dark_bg=True, mode="plain").convert("RGB")
-    app_icon.save(OUT_ROOT / "agenttown-play-icon-512.png", quality=95)
+def draw_logo_variants(theme: BrandTheme = DEFAULT_THEME) -> None:
+    run_targets(logo_targets(theme))
 
 
 def crop_cover(image: Image.Image, target_size: Tuple[int, int]) -> Image.Image:
@@ -403,14 +966,18 @@ def crop_cover(image: Image.Image, target_size: Tuple[int, int]) -> Image.Image:
     return cropped.resize(target_size, Image.Resampling.LANCZOS)
 
 
-def add_phone_mockup(
-    canvas: Image.Image,
-    screenshot: Image.Image,
-    x: int,
-    y: int,
-    width: int,
-    radius: int = 66,
-) -> None:
+def phone_mockup(screenshot: Image.Image, width: int, radius: int = 66) -> Tuple[Image.Image, Image.Image]:
+    """Shadow and framed screenshot for a phone mockup, memoized per screenshot and size.
+
+    Nothing here depends on the theme, so all brands and locales share one resize.
+    Entries keep their screenshot alive, so the id() key cannot be reused while cached.
+    """
+    key = (id(screenshot), width, radius)
+    cached = _PHONE_MOCKUPS.get(key)
+    if cached is not None and cached[0] is screenshot:
+        _PHONE_MOCKUPS.move_to_end(key)
+        return cached[1]
+
     shot_ratio = screenshot.height / screenshot.width
     height = int(width * shot_ratio)
     shot = screenshot.resize((width, height), Image.Resampling.LANCZOS).convert("RGBA")
@@ -427,12 +994,69 @@ def add_phone_mockup(
     shadow = Image.new("RGBA", (width + 40, height + 40), (0, 0, 0, 0))
     s_draw = ImageDraw.Draw(shadow)
     s_draw.rounded_rectangle((0, 0, width + 39, height + 39), radius=radius + 12, fill=(0, 0, 0, 130))
-    shadow = shadow.filter(ImageFilter.GaussianBlur(radius=20))
-    canvas.alpha_composite(shadow, (x - 10, y + 12))
+    shadow = glow_blur(shadow, 20)
     framed.paste(shot, (10, 10), mask)
+
+    _PHONE_MOCKUPS[key] = (screenshot, (shadow, framed))
+    while len(_PHONE_MOCKUPS) > PHONE_MOCKUP_CACHE_SIZE:
+        _PHONE_MOCKUPS.popitem(last=False)
+    return shadow, framed
+
+
+def add_phone_mockup(
+    canvas: Image.Image,
+    screenshot: Image.Image,
+    x: int,
+    y: int,
+    width: int,
+    radius: int = 66,
+) -> None:
+    shadow, framed = phone_mockup(screenshot, width, radius)
+    canvas.alpha_composite(shadow, (x - 10, y + 12))
     canvas.alpha_composite(framed, (x, y))
 
 
+def poster_background(theme: BrandTheme, size: Tuple[int, int], dark: bool) -> Image.Image:
+    """Gradient plus glow for a poster; callers copy before drawing on it.
+
+    Up to POSTER_BACKGROUND_CACHE_SIZE backgrounds are kept for reuse.
+    """
+    key = (theme, size, dark)
+    if key in _POSTER_BACKGROUNDS:
+        _POSTER_BACKGROUNDS.move_to_end(key)
+        return _POSTER_BACKGROUNDS[key]
+    palette = theme.palette
+    width, height = size
+    canvas = gradient(size, *palette[f"poster_bg_{'dark' if dark else 'light'}"]).convert("RGBA")
+    composite_glow(
+        canvas,
+        [
+            ((width - 640, height - 980, width + 80, height - 220), palette["poster_glow_primary"]),
+            ((-320, -140, 380, 560), palette["poster_glow_secondary"]),
+        ],
+        70,
+    )
+    if POSTER_BACKGROUND_CACHE_SIZE:
+        _POSTER_BACKGROUNDS[key] = canvas
+        while len(_POSTER_BACKGROUNDS) > POSTER_BACKGROUND_CACHE_SIZE:
+            _POSTER_BACKGROUNDS.popitem(last=False)
+    return canvas
+
+
+def size_render_caches(theme_count: int) -> None:
+    """Size the poster background cache for a build of ``theme_count`` brands.
+
+    Backgrounds are reused across screenshots only if every theme and size stays
+    cached. A single brand rebuilds them instead: the glow masks are cached, and holding
+    ~14 MB per size would lift its peak RSS above what the build needed before brand
+    theming.
+    """
+    global POSTER_BACKGROUND_CACHE_SIZE
+    POSTER_BACKGROUND_CACHE_SIZE = (len(IOS_POSTER_SIZES) + 1) * theme_count if theme_count > 1 else 0
+    _PHONE_MOCKUPS.clear()
+    _POSTER_BACKGROUNDS.clear()
+
+
 def create_store_poster(
     output_path: Path,
     size: Tuple[int, int],
@@ -441,25 +1065,17 @@ def create_store_poster(
     badge: str,
     screenshot: Image.Image,
     dark: bool = True,
+    theme: BrandTheme = DEFAULT_THEME,
 ) -> None:
+    palette = theme.palette
+    tone = "dark" if dark else "light"
     width, height = size
-    if dark:
-        bg = gradient(size, (7, 9, 34), (22, 24, 48))
-    else:
-        bg = gradient(size, (240, 247, 255), (228, 244, 232))
-    canvas = bg.convert("RGBA")
-
-    glow = Image.new("RGBA", size, (0, 0, 0, 0))
-    g_draw = ImageDraw.Draw(glow)
-    g_draw.ellipse((width - 640, height - 980, width + 80, height - 220), fill=(34, 197, 94, 82))
-    g_draw.ellipse((-320, -140, 380, 560), fill=(59, 130, 246, 75))
-    glow = glow.filter(ImageFilter.GaussianBlur(radius=70))
-    canvas = Image.alpha_composite(canvas, glow)
+    canvas = poster_background(theme, size, dark).copy()
 
-    title_color = (247, 250, 255, 255) if dark else (15, 23, 42, 255)
-    sub_color = (190, 204, 224, 255) if dark else (71, 85, 105, 255)
-    badge_bg = (34, 197, 94, 255)
-    badge_text = (12, 22, 28, 255)
+    title_color = palette[f"poster_title_{tone}"]
+    sub_color = palette[f"poster_subtitle_{tone}"]
+    badge_bg = palette["accent"] + (255,)
+    badge_text = palette["poster_badge_text"]
 
     draw = ImageDraw.Draw(canvas)
     badge_font = find_font(40, bold=True)
@@ -480,28 +1096,43 @@ def create_store_poster(
     add_phone_mockup(canvas, screenshot, shot_x, shot_y, shot_w, radius=88 if width > 1200 else 70)
 
     output_path.parent.mkdir(parents=True, exist_ok=True)
-    canvas.convert("RGB").save(output_path, quality=95)
+    # Drop the RGBA canvas before encoding so one full-size copy is resident, not two.
+    image = canvas.convert("RGB")
+    del canvas, draw
+    image.save(output_path, quality=95)
 
 
-def create_feature_graphic(output_path: Path, title: str, subtitle: str) -> None:
+def create_feature_graphic(output_path: Path, title: str, subtitle: str, theme: BrandTheme = DEFAULT_THEME) -> None:
+    palette = theme.palette
     size = (1024, 500)
-    bg = gradient(size, (8, 13, 36), (23, 20, 47)).convert("RGBA")
-    overlay = Image.new("RGBA", size, (0, 0, 0, 0))
-    o_draw = ImageDraw.Draw(overlay)
-    o_draw.ellipse((560, -100, 1100, 470), fill=(34, 197, 94, 95))
-    o_draw.ellipse((420, 240, 920, 700), fill=(220, 38, 127, 85))
-    overlay = overlay.filter(ImageFilter.GaussianBlur(radius=56))
-    bg = Image.alpha_composite(bg, overlay)
-
-    logo_mark = draw_brand_mark(size=200, dark_bg=True)
+    bg = gradient(size, *palette["feature_bg"]).convert("RGBA")
+    composite_glow(
+        bg,
+        [
+            ((560, -100, 1100, 470), palette["feature_glow_primary"]),
+            ((420, 240, 920, 700), palette["feature_glow_secondary"]),
+        ],
+        56,
+    )
+
+    logo_mark = cached_brand_mark(theme, 200, True, "card")
     bg.alpha_composite(logo_mark, (70, 145))
     draw = ImageDraw.Draw(bg)
-    draw.text((300, 165), title, font=find_font(78, bold=True), fill=(245, 249, 255, 255))
-    draw.text((300, 270), subtitle, font=find_font(34, bold=False), fill=(180, 196, 218, 255))
+    draw.text((300, 165), title, font=find_font(78, bold=True), fill=palette["feature_title"])
+    draw.text((300, 270), subtitle, font=find_font(34, bold=False), fill=palette["feature_subtitle"])
     output_path.parent.mkdir(parents=True, exist_ok=True)
     bg.convert("RGB").save(output_path, quality=95)
 
 
+@dataclass(frozen=True)
+class ScreenSpec:
+    """A raw screenshot and the poster copy rendered around it, per locale (en, zh)."""
+
+    path: Path
+    key: str
+    copy: dict[str, Tuple[str, str, str]]
+
+
 def resolve_raw_path(primary_name: str, fallback_name: str | None = None) -> Path:
     primary = RAW_DIR / primary_name
     if primary.exists():
@@ -514,140 +1145,1489 @@ def resolve_raw_path(primary_name: str, fallback_name: str | None = None) -> Pat
 
 
 def file_sha1(path: Path) -> str:
-    return hashlib.sha1(path.read_bytes()).hexdigest()
+    digest = hashlib.sha1()
+    with path.open("rb") as handle:
+        for chunk in iter(partial(handle.read, HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as handle:
+        for chunk in iter(partial(handle.read, HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def cached_sha1s(
+    paths: Iterable[Path],
+    cache_path: Path = RAW_HASH_CACHE_PATH,
+    update_cache: bool = True,
+) -> dict[Path, str]:
+    """SHA-1 of each path, reusing entries whose size and mtime are unchanged.
+
+    New hashes are written back to ``cache_path`` unless ``update_cache`` is false.
+    """
+    try:
+        cache = json.loads(cache_path.read_text())
+    except (OSError, ValueError):
+        cache = {}
+    hashes: dict[Path, str] = {}
+    changed = False
+    for path in paths:
+        stat = path.stat()
+        entry = cache.get(path.name)
+        if entry and entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns:
+            hashes[path] = entry["sha1"]
+            continue
+        hashes[path] = file_sha1(path)
+        cache[path.name] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha1": hashes[path]}
+        changed = True
+    if changed and update_cache:
+        cache_path.write_text(json.dumps(cache, indent=2, sort_keys=True))
+    return hashes
 
 
-def render_all_screens() -> None:
-    ensure_dirs(
-        [
-            OUT_ROOT,
-            IOS_SCREENSHOT_DIR_EN,
-            IOS_SCREENSHOT_DIR_ZH,
-            ANDROID_IMAGES_DIR,
-            ANDROID_EN_SCREENSHOT_DIR,
-            ANDROID_ZH_SCREENSHOT_DIR,
-        ]
-    )
+def default_screen_copy(key: str) -> dict[str, Tuple[str, str, str]]:
+    title = key.replace("_", " ").title()
+    return {"en": (title, "", title.upper())}
 
-    world_path = resolve_raw_path("screen-world-map.png", "screen-home.png")
-    mini_path = resolve_raw_path("screen-mini-apps.png", "screen-town-map.png")
-    chat_path = resolve_raw_path("screen-team-chat.png")
 
-    hashes = {
-        "world": file_sha1(world_path),
-        "mini": file_sha1(mini_path),
-        "chat": file_sha1(chat_path),
-    }
-    if len(set(hashes.values())) < 3:
+def load_screens_manifest(manifest_path: Path) -> list[dict]:
+    """The ``screens`` entries of a manifest, checked for the shape discover_screens reads."""
+    try:
+        manifest = json.loads(manifest_path.read_text())
+    except (OSError, ValueError) as err:
+        raise SystemExit(f"Cannot read screens manifest {manifest_path}: {err}") from err
+    screens = manifest.get("screens") if isinstance(manifest, dict) else None
+    if not isinstance(screens, list) or not screens:
+        raise SystemExit(f"{manifest_path}: expected an object with a non-empty \"screens\" list")
+    for index, item in enumerate(screens, start=1):
+        if not isinstance(item, dict) or not isinstance(item.get("file"), str) or not item["file"]:
+            raise SystemExit(f"{manifest_path}: screens entry {index} needs a \"file\" name")
+        if not isinstance(item.get("key", ""), str):
+            raise SystemExit(f"{manifest_path}: screens entry {index}: \"key\" must be a string")
+        for field_name in ("title", "subtitle", "badge"):
+            value = item.get(field_name, {})
+            if not isinstance(value, dict) or not all(isinstance(text, str) for text in value.values()):
+                raise SystemExit(f"{manifest_path}: screens entry {index}: \"{field_name}\" must map locales to strings")
+    return screens
+
+
+def discover_screens(
+    pattern: str = RAW_SCREEN_PATTERN,
+    manifest_path: Path | None = None,
+    update_hash_cache: bool = True,
+) -> list[ScreenSpec]:
+    """Raw screenshots from ``manifest_path`` if given, else every file matching ``pattern``.
+
+    Without a manifest the three classic screens that match ``pattern`` come first (with
+    their legacy fallback names), followed by any other matches in name order. Copy
+    missing for a screen or a locale falls back to built-in copy, then to the English
+    entry.
+    """
+    known = {name: (key, copy) for name, _, key, copy in KNOWN_SCREENS}
+    entries: list[Tuple[Path, str, dict]] = []
+    if manifest_path is not None:
+        manifest_screens = load_screens_manifest(manifest_path)
+        missing = [item["file"] for item in manifest_screens if not (RAW_DIR / item["file"]).exists()]
+        if missing:
+            raise SystemExit(f"Screens listed in {manifest_path} are missing from {RAW_DIR}:\n" + "\n".join(missing))
+        for item in manifest_screens:
+            key, copy = known.get(item["file"], (Path(item["file"]).stem.removeprefix("screen-").replace("-", "_"), {}))
+            copy = dict(copy)
+            for locale in sorted({*item.get("title", {}), *item.get("subtitle", {}), *item.get("badge", {})}):
+                fallback = copy.get(locale) or copy.get("en") or default_screen_copy(key)["en"]
+                copy[locale] = (
+                    item.get("title", {}).get(locale, fallback[0]),
+                    item.get("subtitle", {}).get(locale, fallback[1]),
+                    item.get("badge", {}).get(locale, fallback[2]),
+                )
+            entries.append((RAW_DIR / item["file"], item.get("key", key), copy))
+    else:
+        matches = sorted(path for path in RAW_DIR.glob(pattern) if path.is_file())
+        claimed = set()
+        for name, aliases, key, copy in KNOWN_SCREENS:
+            claimed.update(RAW_DIR / candidate for candidate in (name, *aliases))
+            for candidate in (name, *aliases):
+                if RAW_DIR / candidate in matches:
+                    entries.append((RAW_DIR / candidate, key, dict(copy)))
+                    break
+        for path in matches:
+            if path not in claimed:
+                entries.append((path, path.stem.removeprefix("screen-").replace("-", "_"), {}))
+
+    screens = []
+    for index, (path, key, copy) in enumerate(entries, start=1):
+        copy = copy or default_screen_copy(key)
+        copy.setdefault("en", default_screen_copy(key)["en"])
+        copy.setdefault("zh", copy["en"])
+        screens.append(ScreenSpec(path, f"{index:02d}_{key}", copy))
+
+    hashes = cached_sha1s((screen.path for screen in screens), update_cache=update_hash_cache)
+    by_hash: dict[str, list[str]] = {}
+    for path, digest in hashes.items():
+        by_hash.setdefault(digest, []).append(path.name)
+    duplicates = [names for names in by_hash.values() if len(names) > 1]
+    if duplicates:
         raise SystemExit(
-            "Raw screenshots are duplicated. Please provide 3 distinct files:\n"
-            "- marketing/store-assets/raw/screen-world-map.png\n"
-            "- marketing/store-assets/raw/screen-mini-apps.png\n"
-            "- marketing/store-assets/raw/screen-team-chat.png\n"
-            f"Current hashes: {hashes}"
+            "Raw screenshots are duplicated. Please provide distinct files:\n"
+            + "\n".join(f"- {' == '.join(names)}" for names in duplicates)
         )
+    return screens
 
-    world_shot = Image.open(world_path).convert("RGB")
-    mini_shot = Image.open(mini_path).convert("RGB")
-    chat_shot = Image.open(chat_path).convert("RGB")
-    world_1290 = crop_cover(world_shot, (1170, 2532))
-    mini_1290 = crop_cover(mini_shot, (1170, 2532))
-    chat_1290 = crop_cover(chat_shot, (1170, 2532))
-
-    en_shots = [
-        ("01_world_map", "Agent World", "Explore your AI neighborhood", "AGENTTOWN", world_1290),
-        ("02_mini_apps", "Mini App Builder", "Create and run apps from chat", "CREATE APP", mini_1290),
-        ("03_team_chat", "Team Collaboration", "Chat, tasks, and bot execution in one place", "TEAM CHAT", chat_1290),
-    ]
-    zh_shots = [
-        ("01_world_map", "世界地图", "在 AI 社区中探索你的 Bot 世界", "AGENTTOWN", world_1290),
-        ("02_mini_apps", "Mini App 生成器", "在聊天中创建并运行应用", "创建应用", mini_1290),
-        ("03_team_chat", "团队协作", "聊天、任务与 Bot 执行一体化", "团队聊天", chat_1290),
-    ]
 
-    ios_sizes = [(1290, 2796), (1242, 2688)]
-    for key, title, subtitle, badge, shot in en_shots:
-        for width, height in ios_sizes:
-            out = IOS_SCREENSHOT_DIR_EN / f"{key}_{width}x{height}.png"
-            create_store_poster(out, (width, height), title, subtitle, badge, shot, dark=True)
-    for key, title, subtitle, badge, shot in zh_shots:
-        for width, height in ios_sizes:
-            out = IOS_SCREENSHOT_DIR_ZH / f"{key}_{width}x{height}.png"
-            create_store_poster(out, (width, height), title, subtitle, badge, shot, dark=True)
-
-    android_size = (1080, 1920)
-    for idx, (_, title, subtitle, badge, shot) in enumerate(en_shots, start=1):
-        create_store_poster(
-            ANDROID_EN_SCREENSHOT_DIR / f"{idx}.png",
-            android_size,
-            title,
-            subtitle,
-            badge,
-            shot,
-            dark=True,
-        )
-    for idx, (_, title, subtitle, badge, shot) in enumerate(zh_shots, start=1):
-        create_store_poster(
-            ANDROID_ZH_SCREENSHOT_DIR / f"{idx}.png",
-            android_size,
-            title,
-            subtitle,
-            badge,
-            shot,
-            dark=True,
-        )
+def cropped_screen(path: Path) -> Image.Image:
+    """Decode and crop a raw screenshot, keeping at most SCREEN_BATCH_SIZE crops resident."""
+    if path in _CROPPED_SCREENS:
+        _CROPPED_SCREENS.move_to_end(path)
+        return _CROPPED_SCREENS[path]
+    with Image.open(path) as raw:
+        cropped = crop_cover(raw.convert("RGB"), SCREEN_CROP_SIZE)
+    _CROPPED_SCREENS[path] = cropped
+    while len(_CROPPED_SCREENS) > max(1, SCREEN_BATCH_SIZE):
+        _CROPPED_SCREENS.popitem(last=False)
+    return cropped
+
 
-    create_feature_graphic(
-        ANDROID_IMAGES_DIR / "featureGraphic.png",
-        "AgentTown",
-        "Chat-driven AI Mini Apps",
+def render_screen_poster(
+    output_path: Path,
+    size: Tuple[int, int],
+    title: str,
+    subtitle: str,
+    badge: str,
+    screen_path: Path,
+    theme: BrandTheme = DEFAULT_THEME,
+) -> None:
+    create_store_poster(
+        output_path,
+        size,
+        theme.text(title),
+        theme.text(subtitle),
+        theme.text(badge),
+        cropped_screen(screen_path),
+        dark=True,
+        theme=theme,
     )
-    draw_brand_mark(size=512, dark_bg=True, mode="plain").convert("RGB").save(
-        ANDROID_IMAGES_DIR / "icon.png", quality=95
+
+
+def poster_cost(size: Tuple[int, int]) -> float:
+    # Gradient, two 70px glows and composites at canvas size, the shot resize and its
+    # 20px shadow, then the PNG encode.
+    area = size[0] * size[1]
+    return (
+        area * 3.0
+        + 2 * blur_cost(area * 0.25, 70)
+        + SCREEN_CROP_SIZE[0] * SCREEN_CROP_SIZE[1] * 2.0
+        + blur_cost(area * 0.5, 20)
+        + encode_cost(area, "png")
     )
 
 
-def main() -> None:
-    ensure_dirs([RAW_DIR])
-    required_names = [
-        "screen-world-map.png",
-        "screen-mini-apps.png",
-        "screen-team-chat.png",
+def feature_graphic_cost() -> float:
+    area = 1024 * 500
+    return area * 3.0 + 2 * blur_cost(area * 0.5, 56) + brand_mark_cost(200) + encode_cost(area, "png")
+
+
+def screen_targets(screens: Iterable[ScreenSpec], themes: Iterable[BrandTheme] = (DEFAULT_THEME,)) -> list[BuildTarget]:
+    """Posters grouped per screenshot (across all themes), so each crop is decoded once.
+
+    Screens past a store's upload limit get no poster for that store.
+    """
+    themes = list(themes)
+    screens = list(screens)
+    for store, limit in (("App Store", IOS_MAX_SCREENS), ("Google Play", ANDROID_MAX_SCREENS)):
+        if len(screens) > limit:
+            skipped = ", ".join(screen.path.name for screen in screens[limit:])
+            print(f"Warning: {store} accepts {limit} screenshots per locale; no {store} posters for {skipped}.")
+    locales = [
+        ("en", IOS_SCREENSHOT_DIR_EN, ANDROID_EN_SCREENSHOT_DIR),
+        ("zh", IOS_SCREENSHOT_DIR_ZH, ANDROID_ZH_SCREENSHOT_DIR),
+    ]
+    targets = []
+    for idx, screen in enumerate(screens, start=1):
+        posters = [("ios", size) for size in IOS_POSTER_SIZES] if idx <= IOS_MAX_SCREENS else []
+        if idx <= ANDROID_MAX_SCREENS:
+            posters.append(("android", ANDROID_POSTER_SIZE))
+        # Size outermost, so each phone mockup is built once and reused by every theme and locale.
+        for store, size in posters:
+            for theme in themes:
+                for locale, ios_dir, android_dir in locales:
+                    title, subtitle, badge = screen.copy[locale]
+                    if store == "ios":
+                        name = f"ios/{locale}/{screen.key}_{size[0]}x{size[1]}"
+                        out = theme.path(ios_dir) / f"{screen.key}_{size[0]}x{size[1]}.png"
+                    else:
+                        name = f"android/{locale}/{idx}"
+                        out = theme.path(android_dir) / f"{idx}.png"
+                    targets.append(
+                        BuildTarget(
+                            theme.target_name(name),
+                            (out,),
+                            poster_cost(size),
+                            partial(render_screen_poster, out, size, title, subtitle, badge, screen.path, theme),
+                            (screen.path,),
+                        )
+                    )
+
+    for theme in themes:
+        feature_path = theme.path(ANDROID_IMAGES_DIR) / "featureGraphic.png"
+        targets.append(
+            BuildTarget(
+                theme.target_name("android/feature-graphic"),
+                (feature_path,),
+                feature_graphic_cost(),
+                partial(create_feature_graphic, feature_path, theme.wordmark, theme.feature_tagline, theme),
+            )
+        )
+        icon_path = theme.path(ANDROID_IMAGES_DIR) / "icon.png"
+        targets.append(
+            BuildTarget(
+                theme.target_name("android/icon"),
+                (icon_path,),
+                brand_mark_cost(512) + encode_cost(512 * 512, "png"),
+                partial(save_brand_mark, icon_path, 512, True, "plain", rgb=True, theme=theme),
+            )
+        )
+    return targets
+
+
+def prune_stale_posters(outputs: Iterable[Path]) -> list[Path]:
+    """Delete generated posters that are not in ``outputs`` and return them.
+
+    fastlane uploads every file in a screenshot directory, so posters left over from a
+    run with more screens must go. Only files named like generated posters, in
+    screenshot directories that ``outputs`` writes to, are removed.
+    """
+    outputs = set(outputs)
+    suffixes = [directory.relative_to(ROOT).parts for directory in POSTER_DIRS]
+    directories = {
+        path.parent for path in outputs if any(path.parent.parts[-len(suffix) :] == suffix for suffix in suffixes)
+    }
+    removed = []
+    for directory in sorted(directories):
+        for path in sorted(directory.glob("*.png")):
+            if path not in outputs and POSTER_NAME.fullmatch(path.name):
+                path.unlink()
+                removed.append(path)
+    return removed
+
+
+def report_pruned_posters(outputs: Iterable[Path]) -> None:
+    removed = prune_stale_posters(outputs)
+    if removed:
+        print(f"Removed {len(removed)} stale poster(s):")
+        for path in removed:
+            print(f"- {display_path(path)}")
+
+
+def render_all_screens(screens: Iterable[ScreenSpec] | None = None, theme: BrandTheme = DEFAULT_THEME) -> None:
+    run_targets(screen_targets(discover_screens() if screens is None else screens, [theme]))
+
+
+def runtime_icon_targets(
+    theme: BrandTheme = DEFAULT_THEME,
+    optimize: bool = True,
+    jobs: int | None = None,
+    error_budget: int = ASSET_ERROR_BUDGET,
+) -> list[BuildTarget]:
+    resized_area = sum(px * px for sizes in (LAUNCHER_SIZES, FOREGROUND_SIZES, SPLASH_SIZES) for px in sizes.values())
+    png_area = 8 * 1024 * 1024 + sum(px * px for px in SPLASH_SIZES.values())
+    webp_area = sum(px * px for px in LAUNCHER_SIZES.values()) * 2 + sum(px * px for px in FOREGROUND_SIZES.values())
+    # Identical PNGs are optimized once, so only the 1024 icon and the splash sizes count.
+    optimize_area = 1024 * 1024 + sum(px * px for px in SPLASH_SIZES.values())
+    return [
+        BuildTarget(
+            theme.target_name("runtime/icons"),
+            tuple(runtime_icon_outputs(theme)),
+            brand_mark_cost(1024)
+            + resized_area * 2.0
+            + encode_cost(png_area, "png")
+            + encode_cost(webp_area, "webp")
+            + (encode_cost(optimize_area, "optimize") if optimize else 0.0),
+            partial(
+                build_runtime_icons,
+                theme,
+                optimize=optimize,
+                jobs=jobs,
+                error_budget=error_budget,
+            ),
+        )
     ]
-    compatibility_missing = []
+
+
+def parse_color(value, default: tuple) -> tuple:
+    """Parse "#rrggbb[aa]" or a list into a color shaped like ``default`` (alpha kept if omitted)."""
+    if isinstance(value, str):
+        hex_value = value.lstrip("#")
+        if len(hex_value) not in (6, 8):
+            raise ValueError(f"bad color {value!r}")
+        value = [int(hex_value[idx : idx + 2], 16) for idx in range(0, len(hex_value), 2)]
+    color = tuple(int(channel) for channel in value)
+    if len(color) == 3 and len(default) == 4:
+        color += default[3:]
+    if len(color) != len(default):
+        raise ValueError(f"color {value!r} needs {len(default)} channels")
+    return color
+
+
+def load_theme(source: str | Path) -> BrandTheme:
+    """Load a theme JSON (a path, or a name in marketing/store-assets/themes/).
+
+    Keys: name (default: the file stem; letters, digits, "_" and "-" only), wordmark,
+    tagline, feature_tagline, logo_badge, output_root (relative to the repo root;
+    default marketing/store-assets/brands/<name>) and palette, whose entries override
+    DEFAULT_PALETTE. Gradients are two-color lists.
+    """
+    if str(source) == DEFAULT_THEME_NAME:
+        return DEFAULT_THEME
+    path = Path(source)
+    if not path.suffix:
+        path = THEMES_DIR / f"{source}.json"
+    data = json.loads(path.read_text())
+    name = data.get("name", path.stem)
+    if not isinstance(name, str) or not THEME_NAME.fullmatch(name):
+        raise SystemExit(f"{path}: theme name {name!r} may only use letters, digits, '_' and '-'")
+    palette = dict(DEFAULT_PALETTE)
+    for key, value in data.get("palette", {}).items():
+        if key not in DEFAULT_PALETTE:
+            raise SystemExit(f"{path}: unknown palette key {key!r}")
+        default = DEFAULT_PALETTE[key]
+        try:
+            if isinstance(default[0], tuple):
+                palette[key] = tuple(parse_color(stop, default[idx]) for idx, stop in enumerate(value))
+            else:
+                palette[key] = parse_color(value, default)
+        except (TypeError, ValueError) as err:
+            raise SystemExit(f"{path}: palette {key}: {err}") from err
+    output_root = ROOT / data.get("output_root", BRANDS_OUT_DIR.relative_to(ROOT) / name)
+    return BrandTheme(
+        name=name,
+        wordmark=data.get("wordmark", DEFAULT_THEME.wordmark),
+        tagline=data.get("tagline", DEFAULT_THEME.tagline),
+        feature_tagline=data.get("feature_tagline", DEFAULT_THEME.feature_tagline),
+        logo_badge=data.get("logo_badge", DEFAULT_THEME.logo_badge),
+        palette=palette,
+        output_root=output_root,
+    )
+
+
+def build_targets(args: argparse.Namespace, themes: Iterable[BrandTheme] = (DEFAULT_THEME,)) -> list[BuildTarget]:
+    """Every target of a full run: logos, screens, then runtime icons, for each theme.
+
+    Posters of all themes are grouped per screenshot so decoded crops are shared.
+    """
+    themes = list(themes)
+    targets = [target for theme in themes for target in logo_targets(theme)]
+    # --plan is a dry run and must not even refresh the hash cache.
+    screens = discover_screens(args.raw_pattern, args.screens_manifest, update_hash_cache=not args.plan)
+    targets += screen_targets(screens, themes)
+    for theme in themes:
+        targets += runtime_icon_targets(
+            theme,
+            optimize=not args.skip_optimize,
+            jobs=args.jobs,
+            error_budget=args.error_budget,
+        )
+    return targets
+
+
+def current_rss_mb() -> float:
     try:
-        resolve_raw_path("screen-world-map.png", "screen-home.png")
-    except FileNotFoundError:
-        compatibility_missing.append("screen-world-map.png (or screen-home.png)")
+        resident_pages = int(Path("/proc/self/statm").read_text().split()[1])
+    except OSError:
+        return peak_rss_mb()
+    return resident_pages * os.sysconf("SC_PAGE_SIZE") / 2**20
+
+
+def peak_rss_mb(who: int = resource.RUSAGE_SELF) -> float:
+    if who == resource.RUSAGE_SELF:
+        try:
+            for line in Path("/proc/self/status").read_text().splitlines():
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+        except OSError:
+            pass
+    # ru_maxrss is in KiB on Linux and bytes on macOS.
+    maxrss = resource.getrusage(who).ru_maxrss
+    return maxrss / 2**20 if sys.platform == "darwin" else maxrss / 1024
+
+
+def reset_peak_rss() -> None:
+    """Restart the kernel's peak-RSS counter where supported (Linux)."""
     try:
-        resolve_raw_path("screen-mini-apps.png", "screen-town-map.png")
-    except FileNotFoundError:
-        compatibility_missing.append("screen-mini-apps.png (or screen-town-map.png)")
+        Path("/proc/self/clear_refs").write_text("5")
+    except OSError:
+        pass
+
+
+def release_render_caches() -> None:
+    """Drop every memoized image so the next target starts from a small heap."""
+    for cached in (rounded_mask, ellipse_mask, blurred_ellipse_masks, cached_brand_mark):
+        cached.cache_clear()
+    _CROPPED_SCREENS.clear()
+    _PHONE_MOCKUPS.clear()
+    _POSTER_BACKGROUNDS.clear()
+    gc.collect()
+
+
+class MemoryBudget:
+    """Schedules a --max-memory build so resident memory stays under ``limit_mb``.
+
+    Caches may fill at most half the budget. They are also dropped before a target
+    whenever the current RSS plus the largest peak growth seen for that kind of target
+    would pass the limit, and before the first target of each kind. The optimizer pass
+    gets whatever is left (see optimizer_plan).
+    """
+
+    def __init__(self, limit_mb: float) -> None:
+        self.limit_mb = limit_mb
+        self.peak_mb = peak_rss_mb()
+        self.step_mb: dict[str, float] = {}
+        self.releases = 0
+        self.workers = 0
+        self.pool_main_mb = 0.0
+        self.notes: list[str] = []
+        self._before_mb = 0.0
+
+    def before_target(self, target: BuildTarget) -> None:
+        rss = current_rss_mb()
+        step = self.step_mb.get(target.render.func.__name__, self.limit_mb)
+        if rss > self.limit_mb / 2 or rss + step > self.limit_mb:
+            release_render_caches()
+            self.releases += 1
+            rss = current_rss_mb()
+        self._before_mb = rss
+        reset_peak_rss()
+
+    def after_target(self, target: BuildTarget) -> None:
+        peak = max(peak_rss_mb(), current_rss_mb())
+        self.peak_mb = max(self.peak_mb, peak)
+        kind = target.render.func.__name__
+        self.step_mb[kind] = max(self.step_mb.get(kind, 0.0), peak - self._before_mb)
+
+    def optimizer_plan(self, jobs: int | None) -> int:
+        """Worker count for an optimizer pass that fits the budget.
+
+        Caches are dropped first. Spawned workers are used while at least one fits next
+        to the main process. Otherwise the pass runs in-process (0 workers), which saves
+        a worker interpreter, and the build stops when even that cannot fit.
+        """
+        release_render_caches()
+        self.releases += 1
+        main_mb = current_rss_mb()
+        spare = self.limit_mb - main_mb
+        if spare >= OPTIMIZE_WORKER_MB:
+            workers = min(jobs or os.cpu_count() or 1, int(spare // OPTIMIZE_WORKER_MB))
+            self.pool_main_mb = max(self.pool_main_mb, main_mb)
+            self.workers = max(self.workers, workers)
+            return workers
+        if spare >= OPTIMIZE_INPROCESS_MB:
+            self.notes.append(f"optimized in-process, {spare:.0f} MB left and a worker needs about {OPTIMIZE_WORKER_MB} MB.")
+            return 0
+        raise SystemExit(
+            f"--max-memory {self.limit_mb:.0f} MB leaves {spare:.0f} MB for asset optimization, which needs "
+            f"about {OPTIMIZE_INPROCESS_MB} MB. Raise the budget or pass --skip-optimize."
+        )
+
+    def report(self) -> None:
+        """Print the peak-RSS report and fail the build if the budget was exceeded.
+
+        While optimizer workers run, the main process is idle at ``pool_main_mb``, so
+        that phase counts as that RSS plus every worker at the largest worker's peak.
+        """
+        self.peak_mb = max(self.peak_mb, peak_rss_mb())
+        total = self.peak_mb
+        print(f"Memory: peak RSS {self.peak_mb:.0f} MB in the main process ({self.releases} cache releases).")
+        for note in self.notes:
+            print(f"Memory: {note}")
+        if self.workers:
+            worker_mb = peak_rss_mb(resource.RUSAGE_CHILDREN)
+            pool_mb = self.pool_main_mb + self.workers * worker_mb
+            total = max(total, pool_mb)
+            print(
+                f"Memory: {pool_mb:.0f} MB while optimizing "
+                f"({self.pool_main_mb:.0f} MB main + {self.workers} x {worker_mb:.0f} MB workers)."
+            )
+        print(f"Memory: peak {total:.0f} MB of a {self.limit_mb:.0f} MB budget.")
+        if total > self.limit_mb:
+            raise SystemExit(f"Peak memory {total:.0f} MB exceeded --max-memory {self.limit_mb:.0f} MB.")
+
+
+def run_targets(targets: Iterable[BuildTarget], timings: dict[str, float] | None = None) -> list[Path]:
+    """Render targets in order and return every file they wrote.
+
+    Each target's wall time in seconds is stored in ``timings`` when given. Under
+    --max-memory, MEMORY_BUDGET decides before each target whether to drop caches.
+    """
+    written: list[Path] = []
+    for target in targets:
+        if MEMORY_BUDGET is not None:
+            MEMORY_BUDGET.before_target(target)
+        started = time.perf_counter()
+        target.render()
+        if timings is not None:
+            timings[target.name] = time.perf_counter() - started
+        if MEMORY_BUDGET is not None:
+            MEMORY_BUDGET.after_target(target)
+        missing = [path for path in target.outputs if not path.exists()]
+        if missing:
+            raise SystemExit(f"Target {target.name} did not write: {', '.join(str(path) for path in missing)}")
+        written.extend(target.outputs)
+    return written
+
+
+def assign_shards(targets: Iterable[BuildTarget], total: int) -> list[list[BuildTarget]]:
+    """Deterministic longest-processing-time assignment: costliest target to the lightest shard.
+
+    Ties break on target name and shard index, so every runner computes the same split.
+    Each shard keeps the original target order.
+    """
+    targets = list(targets)
+    loads = [0.0] * total
+    assigned: dict[str, int] = {}
+    for target in sorted(targets, key=lambda item: (-item.cost, item.name)):
+        shard = min(range(total), key=lambda idx: (loads[idx], idx))
+        loads[shard] += target.cost
+        assigned[target.name] = shard
+    shards: list[list[BuildTarget]] = [[] for _ in range(total)]
+    for target in targets:
+        shards[assigned[target.name]].append(target)
+    return shards
+
+
+def shard_relative_path(path: Path) -> str:
+    if not path.is_relative_to(ROOT):
+        raise SystemExit(f"Sharded builds need every output inside the repo, got {path}")
+    return path.relative_to(ROOT).as_posix()
+
+
+def shard_plan(targets: Iterable[BuildTarget], total: int, settings: dict) -> dict:
+    """Target-to-shard assignment plus everything the shards must agree on.
+
+    The digest covers targets, outputs, settings and the SHA-1 of every input
+    screenshot, so --merge rejects shards rendered from different raw files.
+    """
+    targets = list(targets)
+    shards = assign_shards(targets, total)
+    input_sha1s = cached_sha1s({path for target in targets for path in target.inputs})
+    plan = {
+        "total": total,
+        "settings": settings,
+        "inputs": {shard_relative_path(path): digest for path, digest in sorted(input_sha1s.items())},
+        "targets": {
+            target.name: {
+                "shard": index + 1,
+                "outputs": [shard_relative_path(path) for path in target.outputs],
+            }
+            for index, shard in enumerate(shards)
+            for target in shard
+        },
+    }
+    plan["digest"] = hashlib.sha256(json.dumps(plan, sort_keys=True).encode("utf-8")).hexdigest()
+    return plan
+
+
+def pack_shard(index: int, plan: dict, targets: list[BuildTarget], written: Iterable[Path], shard_dir: Path) -> Path:
+    """Write ``shard-<i>-of-<N>.tar.gz`` holding the shard's files and a checksummed manifest."""
+    files = {shard_relative_path(path): path for path in written}
+    manifest = {
+        "shard": index,
+        "plan": plan,
+        "targets": [target.name for target in targets],
+        "files": {rel: file_sha256(path) for rel, path in sorted(files.items())},
+    }
+    shard_dir.mkdir(parents=True, exist_ok=True)
+    tarball = shard_dir / f"shard-{index}-of-{plan['total']}.tar.gz"
+
+    def add_bytes(tar: tarfile.TarFile, name: str, data: bytes) -> None:
+        info = tarfile.TarInfo(name)
+        info.size = len(data)
+        info.mode = 0o644
+        tar.addfile(info, io.BytesIO(data))
+
+    # Fixed member order, zero mtimes and a zero gzip timestamp keep tarballs reproducible.
+    with tarball.open("wb") as raw, gzip.GzipFile(fileobj=raw, mode="wb", mtime=0) as gz:
+        with tarfile.open(fileobj=gz, mode="w", format=tarfile.PAX_FORMAT) as tar:
+            add_bytes(tar, "manifest.json", json.dumps(manifest, indent=2, sort_keys=True).encode("utf-8"))
+            for rel, path in sorted(files.items()):
+                add_bytes(tar, rel, path.read_bytes())
+    return tarball
+
+
+def parse_shard(value: str) -> Tuple[int, int]:
+    try:
+        index_text, total_text = value.split("/")
+        index, total = int(index_text), int(total_text)
+    except ValueError as err:
+        raise argparse.ArgumentTypeError(f"expected i/N, got {value!r}") from err
+    if total < 1 or not 1 <= index <= total:
+        raise argparse.ArgumentTypeError(f"shard index must be within 1..N, got {value!r}")
+    return index, total
+
+
+def parse_positive_int(value: str) -> int:
     try:
-        resolve_raw_path("screen-team-chat.png")
-    except FileNotFoundError:
-        compatibility_missing.append("screen-team-chat.png")
+        number = int(value)
+    except ValueError as err:
+        raise argparse.ArgumentTypeError(f"expected a positive integer, got {value!r}") from err
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"expected a positive integer, got {value!r}")
+    return number
 
-    missing = compatibility_missing
-    if missing:
+
+def safe_relative_path(name: str) -> PurePosixPath:
+    rel = PurePosixPath(name)
+    if rel.is_absolute() or not rel.parts or ".." in rel.parts:
+        raise SystemExit(f"Refusing unsafe path in shard tarball: {name}")
+    return rel
+
+
+def merge_shards(tarballs: Iterable[Path]) -> None:
+    """Verify a complete set of shard tarballs and place their files into the tree.
+
+    Nothing is written under ROOT until every shard is present, every planned target is
+    covered exactly once and every file matches its manifest checksum.
+    """
+    manifests: dict[int, Tuple[Path, dict]] = {}
+    for tarball in tarballs:
+        try:
+            with tarfile.open(tarball, "r:gz") as tar:
+                member = tar.extractfile("manifest.json")
+                if member is None:
+                    raise SystemExit(f"{tarball}: manifest.json is not a file")
+                manifest = json.load(member)
+        except KeyError:
+            raise SystemExit(f"{tarball}: missing manifest.json") from None
+        except (OSError, ValueError, tarfile.TarError) as err:
+            raise SystemExit(f"{tarball}: not a readable shard tarball ({err})") from err
+        shard = manifest["shard"]
+        if shard in manifests:
+            raise SystemExit(f"Shard {shard} given twice: {manifests[shard][0]} and {tarball}")
+        manifests[shard] = (tarball, manifest)
+    if not manifests:
+        raise SystemExit("No shard tarballs given to --merge.")
+
+    plans = {manifest["plan"]["digest"] for _, manifest in manifests.values()}
+    if len(plans) != 1:
         raise SystemExit(
-            "Missing raw screenshots:\n"
-            + "\n".join(missing)
-            + "\nCapture examples:\n"
-            + "xcrun simctl io booted screenshot marketing/store-assets/raw/screen-world-map.png\n"
-            + "xcrun simctl io booted screenshot marketing/store-assets/raw/screen-mini-apps.png\n"
-            + "xcrun simctl io booted screenshot marketing/store-assets/raw/screen-team-chat.png"
+            "Shard tarballs come from different build plans (targets, shard count, settings or input screenshots differ)."
         )
-    draw_logo_variants()
-    render_all_screens()
-    generate_runtime_icons()
-    print("Store assets generated successfully.")
-    print(f"- Logos: {LOGO_DIR}")
-    print(f"- iOS screenshots: {IOS_SCREENSHOT_DIR_EN} and {IOS_SCREENSHOT_DIR_ZH}")
+    plan = next(iter(manifests.values()))[1]["plan"]
+    expected_shards = set(range(1, plan["total"] + 1))
+    if set(manifests) != expected_shards:
+        missing = sorted(expected_shards - set(manifests))
+        total = plan["total"]
+        raise SystemExit(f"Missing shard tarball(s): {', '.join(f'{idx}/{total}' for idx in missing)}")
+
+    owners: dict[str, int] = {}
+    for shard, (tarball, manifest) in sorted(manifests.items()):
+        planned = {name for name, entry in plan["targets"].items() if entry["shard"] == shard}
+        if set(manifest["targets"]) != planned:
+            raise SystemExit(f"{tarball}: targets do not match the plan for shard {shard}")
+        for name in planned:
+            for rel in plan["targets"][name]["outputs"]:
+                if rel not in manifest["files"]:
+                    raise SystemExit(f"{tarball}: target {name} is missing {rel}")
+        for rel in manifest["files"]:
+            if rel in owners:
+                raise SystemExit(f"{rel} is produced by both shard {owners[rel]} and shard {shard}")
+            owners[rel] = shard
+
+    staging = Path(tempfile.mkdtemp(prefix=".store-assets-merge-", dir=ROOT))
+    try:
+        for shard, (tarball, manifest) in sorted(manifests.items()):
+            seen = set()
+            with tarfile.open(tarball, "r:gz") as tar:
+                for member in tar.getmembers():
+                    if member.name == "manifest.json":
+                        continue
+                    rel = safe_relative_path(member.name).as_posix()
+                    source = tar.extractfile(member) if member.isfile() else None
+                    if source is None or rel not in manifest["files"]:
+                        raise SystemExit(f"{tarball}: unexpected member {member.name}")
+                    data = source.read()
+                    if hashlib.sha256(data).hexdigest() != manifest["files"][rel]:
+                        raise SystemExit(f"{tarball}: checksum mismatch for {rel}")
+                    staged = staging / rel
+                    staged.parent.mkdir(parents=True, exist_ok=True)
+                    staged.write_bytes(data)
+                    seen.add(rel)
+            if seen != set(manifest["files"]):
+                missing = sorted(set(manifest["files"]) - seen)
+                raise SystemExit(f"{tarball}: manifest lists files not in the archive: {', '.join(missing)}")
+
+        for rel in sorted(owners):
+            destination = ROOT / rel
+            destination.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(staging / rel, destination)
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+    print(f"Merged {len(manifests)} shard(s): {len(plan['targets'])} targets, {len(owners)} files.")
+    report_pruned_posters(ROOT / rel for entry in plan["targets"].values() for rel in entry["outputs"])
+
+
+def fingerprint_default(value):
+    if isinstance(value, Path):
+        return display_path(value)
+    if isinstance(value, BrandTheme):
+        return vars(value)
+    raise TypeError(f"cannot fingerprint {type(value).__name__}")
+
+
+def target_fingerprints(targets: Iterable[BuildTarget], update_hash_cache: bool = True) -> dict[str, str]:
+    """Hash of everything a target's pixels depend on.
+
+    That is this script, the glow quality, the render arguments and the contents of the
+    target's input files.
+    """
+    targets = list(targets)
+    script_sha1 = file_sha1(Path(__file__))
+    input_sha1s = cached_sha1s({path for target in targets for path in target.inputs}, update_cache=update_hash_cache)
+    fingerprints = {}
+    for target in targets:
+        render = target.render
+        # The optimizer's worker count does not change its output.
+        keywords = {key: value for key, value in render.keywords.items() if key != "jobs"}
+        payload = [
+            script_sha1,
+            GLOW_QUALITY,
+            render.func.__name__,
+            render.args,
+            keywords,
+            [input_sha1s[path] for path in target.inputs],
+        ]
+        encoded = json.dumps(payload, default=fingerprint_default, sort_keys=True).encode("utf-8")
+        fingerprints[target.name] = hashlib.sha256(encoded).hexdigest()
+    return fingerprints
+
+
+def load_build_stats(path: Path = BUILD_STATS_PATH) -> dict:
+    try:
+        return json.loads(path.read_text())
+    except (OSError, ValueError):
+        return {"targets": {}}
+
+
+def record_build_stats(targets: Iterable[BuildTarget], timings: dict[str, float], path: Path = BUILD_STATS_PATH) -> None:
+    """Store the timing, cost, fingerprint and output mtimes of every target that just ran."""
+    ran = [target for target in targets if target.name in timings]
+    fingerprints = target_fingerprints(ran)
+    stats = load_build_stats(path)
+    for target in ran:
+        stats["targets"][target.name] = {
+            "kind": target.render.func.__name__,
+            "cost": target.cost,
+            "seconds": round(timings[target.name], 4),
+            "fingerprint": fingerprints[target.name],
+            "outputs": {display_path(output): output.stat().st_mtime_ns for output in target.outputs},
+        }
+    path.write_text(json.dumps(stats, indent=2, sort_keys=True) + "\n")
+
+
+def is_fresh(target: BuildTarget, record: dict | None, fingerprint: str) -> bool:
+    """True when the target last ran with the same inputs and its outputs are untouched since."""
+    if record is None or record["fingerprint"] != fingerprint:
+        return False
+    for output in target.outputs:
+        try:
+            mtime_ns = output.stat().st_mtime_ns
+        except OSError:
+            return False
+        if record["outputs"].get(display_path(output)) != mtime_ns:
+            return False
+    return True
+
+
+def calibrate(records: dict) -> Tuple[dict[str, float], float]:
+    """Seconds per cost unit for each render function, fitted to recorded timings.
+
+    Kinds without timings fall back to the rate over all records, or to
+    DEFAULT_SECONDS_PER_COST before the first recorded run.
+    """
+    totals: dict[str, list[float]] = {}
+    for record in records.values():
+        seconds_cost = totals.setdefault(record["kind"], [0.0, 0.0])
+        seconds_cost[0] += record["seconds"]
+        seconds_cost[1] += record["cost"]
+    rates = {kind: seconds / cost for kind, (seconds, cost) in totals.items() if cost}
+    all_seconds = sum(seconds for seconds, _ in totals.values())
+    all_cost = sum(cost for _, cost in totals.values())
+    return rates, all_seconds / all_cost if all_cost else DEFAULT_SECONDS_PER_COST
+
+
+def print_plan(targets: list[BuildTarget], shards: int | None) -> None:
+    """List every target as fresh or stale with its estimated time, then the critical path.
+
+    With ``shards``, the critical path is the slowest lane of the split that ``--shard i/N``
+    uses for N = ``shards``. Nothing is written, not even the screenshot hash cache.
+    """
+    records = load_build_stats()["targets"]
+    fingerprints = target_fingerprints(targets, update_hash_cache=False)
+    rates, fallback_rate = calibrate(records)
+    estimates: dict[str, float] = {}
+    stale: list[BuildTarget] = []
+
+    print(f"Plan: {len(targets)} targets, glow quality {GLOW_QUALITY}")
+    print(f"{'status':<7}{'est.':>9}{'cost':>10}  target")
+    for target in targets:
+        estimates[target.name] = target.cost * rates.get(target.render.func.__name__, fallback_rate)
+        fresh = is_fresh(target, records.get(target.name), fingerprints[target.name])
+        if not fresh:
+            stale.append(target)
+        print(
+            f"{'fresh' if fresh else 'STALE':<7}{estimates[target.name]:>8.2f}s"
+            f"{target.cost / 1e6:>9.1f}M  {target.name}"
+        )
+
+    if records:
+        print(f"Estimates calibrated from {len(records)} recorded target timings ({display_path(BUILD_STATS_PATH)}).")
+    else:
+        print("No recorded timings yet; estimates use the default rate until the first full run.")
     print(
-        "- Android assets: "
-        f"{ANDROID_IMAGES_DIR}, {ANDROID_EN_SCREENSHOT_DIR}, {ANDROID_ZH_SCREENSHOT_DIR}"
+        f"{len(stale)} stale, {len(targets) - len(stale)} fresh. Full run: {sum(estimates.values()):.1f}s sequential; "
+        f"stale targets alone: {sum(estimates[target.name] for target in stale):.1f}s."
+    )
+
+    if not shards:
+        return
+    lanes = assign_shards(targets, shards)
+    lane_seconds = [sum(estimates[target.name] for target in lane) for lane in lanes]
+    critical = max(range(shards), key=lambda idx: (lane_seconds[idx], -idx))
+    print(f"Critical path over {shards} shards: {lane_seconds[critical]:.1f}s in --shard {critical + 1}/{shards}")
+    for target in sorted(lanes[critical], key=lambda item: -estimates[item.name]):
+        print(f"  {estimates[target.name]:>7.2f}s  {target.name}")
+
+
+@lru_cache(maxsize=16)
+def service_theme(name: str) -> BrandTheme:
+    """The built-in theme or ``THEMES_DIR/<name>.json``; never a path given by a client."""
+    if name == DEFAULT_THEME_NAME:
+        return DEFAULT_THEME
+    if not THEME_NAME.fullmatch(name):
+        raise ValueError(f"theme must be a theme name, got {name!r}")
+    return load_theme(THEMES_DIR / f"{name}.json")
+
+
+def share_card_base(theme: BrandTheme, size: Tuple[int, int], dark: bool) -> Image.Image:
+    """Poster background with the brand mark docked bottom-right, shared by every card of a size.
+
+    Cards too small for a SERVICE_MIN_SIDE mark are left without one.
+    """
+    width, height = size
+    canvas = poster_background(theme, size, dark).copy()
+    mark_size = int(min(width, height) * 0.36)
+    if mark_size >= SERVICE_MIN_SIDE:
+        mark = cached_brand_mark(theme, mark_size, dark, "card")
+        canvas.alpha_composite(mark, (width - mark_size - int(height * 0.08), height - mark_size - int(height * 0.08)))
+    return canvas
+
+
+@dataclass(frozen=True)
+class RenderRequest:
+    """A validated /render request. Requests with equal ``geometry`` share one base image."""
+
+    kind: str
+    theme: str
+    size: Tuple[int, int]
+    dark: bool
+    image_format: str
+    title: str
+    subtitle: str
+    badge: str
+
+    @classmethod
+    def from_json(cls, payload) -> "RenderRequest":
+        if not isinstance(payload, dict):
+            raise ValueError("request body must be a JSON object")
+        kind = payload.get("kind", "icon")
+        if not isinstance(kind, str) or kind not in SERVICE_DEFAULT_SIZES:
+            raise ValueError(f"kind must be one of {', '.join(SERVICE_DEFAULT_SIZES)}")
+        size = payload.get("size", SERVICE_DEFAULT_SIZES[kind])
+        size = (size, size) if isinstance(size, int) else size
+        if (
+            not isinstance(size, (list, tuple))
+            or len(size) != 2
+            or not all(isinstance(side, int) and SERVICE_MIN_SIDE <= side <= SERVICE_MAX_SIDE for side in size)
+        ):
+            raise ValueError(f"size must be {SERVICE_MIN_SIDE}..{SERVICE_MAX_SIDE} px per side")
+        size = tuple(size)
+        if kind == "icon" and size[0] != size[1]:
+            raise ValueError("icons are square; pass a single size")
+        image_format = payload.get("format", "png")
+        if not isinstance(image_format, str) or image_format.lower() not in SERVICE_FORMATS:
+            raise ValueError(f"format must be one of {', '.join(SERVICE_FORMATS)}")
+        image_format = image_format.lower()
+        theme = payload.get("theme", DEFAULT_THEME_NAME)
+        if not isinstance(theme, str) or not THEME_NAME.fullmatch(theme):
+            raise ValueError("theme must be a theme name")
+        dark = payload.get("dark", True)
+        if not isinstance(dark, bool):
+            raise ValueError("dark must be true or false")
+        for field_name in ("text", "title", "subtitle", "badge"):
+            if not isinstance(payload.get(field_name, ""), str):
+                raise ValueError(f"{field_name} must be a string")
+        return cls(
+            kind=kind,
+            theme=theme,
+            size=size,
+            dark=dark,
+            image_format=image_format,
+            title=payload.get("text", payload.get("title", "")),
+            subtitle=payload.get("subtitle", ""),
+            badge=payload.get("badge", ""),
+        )
+
+    @property
+    def geometry(self) -> Tuple:
+        # An icon without text is the whole brand mark, so it gets its own base image.
+        return (self.kind, self.theme, self.size, self.dark, self.kind == "icon" and not self.title)
+
+    def base(self) -> Image.Image:
+        """Build the shared base image for this request's geometry (uncached; see RenderBatcher)."""
+        theme = service_theme(self.theme)
+        if self.kind == "share_card":
+            return share_card_base(theme, self.size, self.dark)
+        if self.title:
+            return draw_brand_background(self.size[0], self.dark, "card", theme.palette)
+        return draw_brand_mark(self.size[0], self.dark, "card", theme.palette)
+
+    def render(self, base: Image.Image) -> bytes:
+        theme = service_theme(self.theme)
+        palette = theme.palette
+        tone = "dark" if self.dark else "light"
+        width, height = self.size
+        if self.kind == "icon":
+            if not self.title:
+                image = base
+            else:
+                image = base.copy()
+                draw = ImageDraw.Draw(image)
+                text = theme.text(self.title)
+                font = find_font(max(12, int(width * 0.5 / max(1, min(len(text), 3)) * 1.4)), bold=True)
+                draw.text((width / 2, height / 2), text, font=font, fill=palette[f"symbol_line_{tone}"], anchor="mm")
+        else:
+            image = base.copy()
+            draw = ImageDraw.Draw(image)
+            unit = min(width, height) / 630
+            left, top = int(56 * unit), int(56 * unit)
+            if self.badge:
+                badge = theme.text(self.badge)
+                badge_font = find_font(max(10, int(26 * unit)), bold=True)
+                badge_w = int(draw.textlength(badge, font=badge_font) + 48 * unit)
+                draw.rounded_rectangle(
+                    (left, top, left + badge_w, top + int(46 * unit)),
+                    radius=int(23 * unit),
+                    fill=palette["accent"] + (255,),
+                )
+                draw.text((left + int(24 * unit), top + int(9 * unit)), badge, font=badge_font, fill=palette["poster_badge_text"])
+            title = theme.text(self.title) or theme.wordmark
+            draw.text((left, int(150 * unit)), title, font=find_font(max(12, int(72 * unit)), bold=True), fill=palette[f"poster_title_{tone}"])
+            subtitle = theme.text(self.subtitle) if self.subtitle else theme.feature_tagline
+            draw.text((left, int(250 * unit)), subtitle, font=find_font(max(10, int(34 * unit))), fill=palette[f"poster_subtitle_{tone}"])
+
+        if self.image_format == "jpeg":
+            return encode_image(image.convert("RGB"), "JPEG", quality=90, optimize=True)
+        if self.image_format == "webp":
+            return encode_image(image, "WEBP", quality=90, method=4)
+        return encode_image(image, "PNG", compress_level=6)
+
+
+def image_nbytes(image: Image.Image) -> int:
+    return image.width * image.height * len(image.getbands())
+
+
+class BoundedCache:
+    """Thread-safe LRU bounded by the total ``sizeof`` of its values.
+
+    ``sizeof`` defaults to ``len``, for encoded responses; base images use image_nbytes.
+    """
+
+    def __init__(self, max_bytes: int, sizeof: Callable[[object], int] = len) -> None:
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self.size = 0
+        self._items: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            data = self._items.get(key)
+            if data is not None:
+                self._items.move_to_end(key)
+            return data
+
+    def put(self, key, data) -> None:
+        size = self.sizeof(data)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._items:
+                return
+            self._items[key] = data
+            self.size += size
+            while self.size > self.max_bytes:
+                _, evicted = self._items.popitem(last=False)
+                self.size -= self.sizeof(evicted)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+
+class ServiceStats:
+    """Latency and throughput counters reported by GET /stats."""
+
+    def __init__(self) -> None:
+        self.started = time.monotonic()
+        self.counters = {
+            "requests": 0,
+            "errors": 0,
+            "cache_hits": 0,
+            "renders": 0,
+            "batches": 0,
+            "batched_requests": 0,
+            "largest_batch": 0,
+            "bytes_served": 0,
+        }
+        self._latencies: deque[float] = deque(maxlen=2048)
+        self._lock = threading.Lock()
+
+    def add(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            self.counters[name] += amount
+
+    def record_batch(self, size: int) -> None:
+        with self._lock:
+            self.counters["batches"] += 1
+            self.counters["batched_requests"] += size
+            self.counters["largest_batch"] = max(self.counters["largest_batch"], size)
+
+    def record_latency(self, seconds: float) -> None:
+        with self._lock:
+            self._latencies.append(seconds)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            counters = dict(self.counters)
+            latencies = sorted(self._latencies)
+        uptime = time.monotonic() - self.started
+
+        def percentile(fraction: float) -> float:
+            if not latencies:
+                return 0.0
+            return round(latencies[min(len(latencies) - 1, int(fraction * len(latencies)))] * 1000, 2)
+
+        counters.update(
+            {
+                "uptime_s": round(uptime, 1),
+                "throughput_rps": round(counters["requests"] / max(uptime, 1e-9), 2),
+                "latency_ms": {
+                    "p50": percentile(0.50),
+                    "p95": percentile(0.95),
+                    "p99": percentile(0.99),
+                    "mean": round(sum(latencies) / len(latencies) * 1000, 2) if latencies else 0.0,
+                },
+            }
+        )
+        return counters
+
+
+class RenderBatcher:
+    """Coalesces concurrent requests that share a geometry into one batch.
+
+    The first request for a geometry waits ``window`` seconds for others to join, then
+    takes the shared base image from ``bases`` (building it on a miss) and renders every
+    member; identical requests in a batch are rendered once.
+    """
+
+    def __init__(self, window: float, stats: ServiceStats, bases: BoundedCache) -> None:
+        self.window = window
+        self.stats = stats
+        self.bases = bases
+        self._pending: dict[Tuple, list[Tuple[RenderRequest, threading.Event, dict]]] = {}
+        self._lock = threading.Lock()
+
+    def render(self, request: RenderRequest) -> Tuple[bytes, int]:
+        done = threading.Event()
+        slot: dict = {}
+        with self._lock:
+            batch = self._pending.get(request.geometry)
+            leader = batch is None
+            if leader:
+                batch = self._pending[request.geometry] = []
+            batch.append((request, done, slot))
+        if leader:
+            time.sleep(self.window)
+            with self._lock:
+                members = self._pending.pop(request.geometry)
+            self._run(members)
+        done.wait()
+        if "error" in slot:
+            raise slot["error"]
+        return slot["data"], slot["batch"]
+
+    def base(self, request: RenderRequest) -> Image.Image:
+        base = self.bases.get(request.geometry)
+        if base is None:
+            base = request.base()
+            self.bases.put(request.geometry, base)
+        return base
+
+    def _run(self, members: list[Tuple[RenderRequest, threading.Event, dict]]) -> None:
+        self.stats.record_batch(len(members))
+        rendered: dict[RenderRequest, bytes | Exception] = {}
+        try:
+            base = self.base(members[0][0])
+        except Exception as err:  # noqa: BLE001 - reported to every waiting client
+            base, failure = None, err
+        for request, done, slot in members:
+            if base is None:
+                slot["error"] = failure
+            else:
+                if request not in rendered:
+                    try:
+                        rendered[request] = request.render(base)
+                        self.stats.add("renders")
+                    except Exception as err:  # noqa: BLE001
+                        rendered[request] = err
+                result = rendered[request]
+                if isinstance(result, Exception):
+                    slot["error"] = result
+                else:
+                    slot["data"] = result
+                    slot["batch"] = len(members)
+            done.set()
+
+
+class AssetRenderHandler(BaseHTTPRequestHandler):
+    server_version = "AgentTownAssets/1.0"
+    service: "AssetRenderService"
+
+    def do_GET(self) -> None:
+        if self.path == "/healthz":
+            self.send_json(200, {"ok": True})
+        elif self.path == "/stats":
+            stats = self.service.stats.snapshot()
+            stats["cache"] = {
+                "entries": len(self.service.cache),
+                "bytes": self.service.cache.size,
+                "max_bytes": self.service.cache.max_bytes,
+            }
+            stats["bases"] = {
+                "entries": len(self.service.batcher.bases),
+                "bytes": self.service.batcher.bases.size,
+                "max_bytes": self.service.batcher.bases.max_bytes,
+            }
+            self.send_json(200, stats)
+        else:
+            self.send_json(404, {"error": "not found"})
+
+    def do_POST(self) -> None:
+        if self.path != "/render":
+            self.send_json(404, {"error": "not found"})
+            return
+        started = time.perf_counter()
+        stats = self.service.stats
+        stats.add("requests")
+        try:
+            length = int(self.headers.get("Content-Length", "0"))
+            request = RenderRequest.from_json(json.loads(self.rfile.read(length) or b"{}"))
+            try:
+                service_theme(request.theme)
+            except OSError:
+                raise ValueError(f"unknown theme {request.theme!r}") from None
+        except (Exception, SystemExit) as err:  # noqa: BLE001 - every bad request is a 400
+            stats.add("errors")
+            self.send_json(400, {"error": str(err)})
+            return
+
+        data = self.service.cache.get(request)
+        batch = 0
+        if data is None:
+            try:
+                data, batch = self.service.batcher.render(request)
+            except Exception as err:  # noqa: BLE001 - surface render failures as 500s
+                stats.add("errors")
+                self.send_json(500, {"error": str(err)})
+                return
+            self.service.cache.put(request, data)
+        else:
+            stats.add("cache_hits")
+
+        self.send_response(200)
+        self.send_header("Content-Type", SERVICE_FORMATS[request.image_format])
+        self.send_header("Content-Length", str(len(data)))
+        self.send_header("X-Render-Cache", "miss" if batch else "hit")
+        if batch:
+            self.send_header("X-Render-Batch", str(batch))
+        self.end_headers()
+        self.wfile.write(data)
+        stats.add("bytes_served", len(data))
+        stats.record_latency(time.perf_counter() - started)
+
+    def send_json(self, status: int, payload: dict) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args) -> None:
+        pass
+
+
+class AssetRenderService(ThreadingHTTPServer):
+    """Local render service: POST /render, GET /stats, GET /healthz."""
+
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], cache_bytes: int, base_bytes: int, batch_window: float) -> None:
+        handler = type("BoundAssetRenderHandler", (AssetRenderHandler,), {"service": self})
+        super().__init__(address, handler)
+        self.stats = ServiceStats()
+        self.cache = BoundedCache(cache_bytes)
+        self.batcher = RenderBatcher(batch_window, self.stats, BoundedCache(base_bytes, image_nbytes))
+
+    def warm(self, theme_names: Iterable[str]) -> None:
+        """Load fonts, brand marks and backgrounds for the default sizes before serving."""
+        for name in theme_names:
+            for payload in ({"kind": "icon"}, {"kind": "icon", "text": "A"}, {"kind": "share_card"}):
+                for dark in (True, False):
+                    self.batcher.base(RenderRequest.from_json({**payload, "theme": name, "dark": dark}))
+        for size in (26, 34, 72):
+            find_font(size, bold=True)
+            find_font(size)
+
+
+def parse_address(value: str) -> Tuple[str, int]:
+    host, _, port = value.rpartition(":")
+    try:
+        return host or "127.0.0.1", int(port)
+    except ValueError as err:
+        raise argparse.ArgumentTypeError(f"expected [HOST:]PORT, got {value!r}") from err
+
+
+def serve(
+    address: Tuple[str, int],
+    theme_names: Iterable[str],
+    cache_mb: int,
+    base_cache_mb: int,
+    batch_window_ms: float,
+) -> None:
+    theme_names = list(theme_names)
+    for name in theme_names:
+        try:
+            service_theme(name)
+        except (OSError, ValueError) as err:
+            raise SystemExit(f"--serve only loads the built-in theme or names in {display_path(THEMES_DIR)}: {err}") from err
+    server = AssetRenderService(address, cache_mb * 1024 * 1024, base_cache_mb * 1024 * 1024, batch_window_ms / 1000)
+    server.warm(theme_names)
+    print(f"Serving asset renders on http://{address[0]}:{server.server_address[1]} (POST /render, GET /stats)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Generate AgentTown store listings, logos and runtime icons.")
+    parser.add_argument(
+        "--glow-quality",
+        choices=sorted(GLOW_QUALITY_LEVELS),
+        default=GLOW_QUALITY,
+        help="Glow/shadow blur quality: exact, balanced or draft (max error on opaque pixels 3/255, 3/255 and 4/255).",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=parse_positive_int,
+        default=None,
+        help="Parallel workers for asset optimization (default: CPU count).",
+    )
+    parser.add_argument(
+        "--error-budget",
+        type=int,
+        default=ASSET_ERROR_BUDGET,
+        help="Max per-channel error (0-255, after a 1px blur) allowed for palette PNGs.",
+    )
+    parser.add_argument("--skip-optimize", action="store_true", help="Write runtime icons without the optimization pass.")
+    parser.add_argument(
+        "--raw-pattern",
+        default=RAW_SCREEN_PATTERN,
+        help="Glob (inside marketing/store-assets/raw) for screenshots when no manifest is used.",
+    )
+    parser.add_argument(
+        "--screens-manifest",
+        type=Path,
+        default=None,
+        help="JSON list of screenshots and their copy (default: raw/screens.json if present).",
+    )
+    parser.add_argument(
+        "--screen-batch",
+        type=parse_positive_int,
+        default=SCREEN_BATCH_SIZE,
+        help="Decoded screenshot crops kept in memory at once.",
+    )
+    parser.add_argument(
+        "--theme",
+        action="append",
+        default=None,
+        metavar="NAME_OR_JSON",
+        help="Brand theme to render (repeatable): agenttown, a name in marketing/store-assets/themes/ or a JSON path.",
+    )
+    parser.add_argument(
+        "--all-themes",
+        action="store_true",
+        help="Render the default brand and every theme in marketing/store-assets/themes/ in one process.",
+    )
+    parser.add_argument(
+        "--max-memory",
+        type=parse_positive_int,
+        default=None,
+        metavar="MB",
+        help="Stream the build under a resident-memory budget and print a peak-RSS report.",
+    )
+    parser.add_argument(
+        "--plan",
+        action="store_true",
+        help="Dry run: list targets as fresh or stale with calibrated time estimates.",
     )
+    parser.add_argument(
+        "--shards",
+        type=parse_positive_int,
+        default=None,
+        metavar="N",
+        help="With --plan, also print the critical path over N --shard runners.",
+    )
+    parser.add_argument(
+        "--serve",
+        type=parse_address,
+        default=None,
+        metavar="[HOST:]PORT",
+        help="Run the local render service (POST /render, GET /stats) instead of a build.",
+    )
+    parser.add_argument("--cache-mb", type=int, default=64, help="Render service response cache size in MB.")
+    parser.add_argument(
+        "--base-cache-mb",
+        type=int,
+        default=128,
+        help="Render service cache size in MB for decoded base images shared by identical geometry.",
+    )
+    parser.add_argument(
+        "--batch-window-ms",
+        type=float,
+        default=10.0,
+        help="How long the render service waits to batch requests with identical geometry.",
+    )
+    parser.add_argument(
+        "--shard",
+        type=parse_shard,
+        default=None,
+        metavar="i/N",
+        help="Render only shard i of N (cost-balanced, deterministic) and pack it into a tarball.",
+    )
+    parser.add_argument("--shard-dir", type=Path, default=SHARD_DIR, help="Where --shard writes its tarball.")
+    parser.add_argument(
+        "--merge",
+        type=Path,
+        nargs="+",
+        default=None,
+        metavar="TARBALL",
+        help="Verify shard tarballs for completeness and checksums, then place their files in the tree.",
+    )
+    return parser.parse_args()
+
+
+def check_raw_screenshots(pattern: str = RAW_SCREEN_PATTERN, manifest_path: Path | None = None) -> None:
+    ensure_dirs([RAW_DIR])
+    if manifest_path is not None or any(path.is_file() for path in RAW_DIR.glob(pattern)):
+        return
+    raise SystemExit(
+        f"No raw screenshots matching {pattern} in {RAW_DIR}.\n"
+        "Capture examples:\n"
+        "xcrun simctl io booted screenshot marketing/store-assets/raw/screen-world-map.png\n"
+        "xcrun simctl io booted screenshot marketing/store-assets/raw/screen-mini-apps.png\n"
+        "xcrun simctl io booted screenshot marketing/store-assets/raw/screen-team-chat.png"
+    )
+
+
+def main() -> None:
+    global GLOW_QUALITY, SCREEN_BATCH_SIZE, POSTER_BACKGROUND_CACHE_SIZE, MEMORY_BUDGET
+    args = parse_args()
+    GLOW_QUALITY = args.glow_quality
+
+    if args.merge:
+        merge_shards(args.merge)
+        return
+    if args.serve:
+        serve(args.serve, args.theme or [DEFAULT_THEME_NAME], args.cache_mb, args.base_cache_mb, args.batch_window_ms)
+        return
+
+    SCREEN_BATCH_SIZE = args.screen_batch
+    if args.screens_manifest is None and RAW_SCREENS_MANIFEST_PATH.exists():
+        args.screens_manifest = RAW_SCREENS_MANIFEST_PATH
+    check_raw_screenshots(args.raw_pattern, args.screens_manifest)
+    theme_sources = list(args.theme or [DEFAULT_THEME_NAME])
+    if args.all_themes:
+        theme_sources = [DEFAULT_THEME_NAME] + sorted(str(path) for path in THEMES_DIR.glob("*.json"))
+    themes = [load_theme(source) for source in theme_sources]
+    names = [theme.name for theme in themes]
+    if len(set(names)) != len(names):
+        raise SystemExit(f"Duplicate theme names: {', '.join(names)}")
+    targets = build_targets(args, themes)
+    if args.plan:
+        print_plan(targets, args.shards)
+        return
+
+    size_render_caches(len(themes))
+    if args.max_memory is not None:
+        if args.max_memory < MIN_MEMORY_BUDGET_MB:
+            raise SystemExit(
+                f"--max-memory {args.max_memory} MB is below the {MIN_MEMORY_BUDGET_MB} MB a 1290x2796 poster needs; "
+                "raise the budget."
+            )
+        # One decoded shot and no backgrounds; posters are already grouped per shot and size.
+        SCREEN_BATCH_SIZE = 1
+        POSTER_BACKGROUND_CACHE_SIZE = 0
+        MEMORY_BUDGET = MemoryBudget(args.max_memory)
+
+    timings: dict[str, float] = {}
+    if args.shard:
+        index, total = args.shard
+        settings = {
+            "glow_quality": args.glow_quality,
+            "error_budget": args.error_budget,
+            "optimize": not args.skip_optimize,
+        }
+        plan = shard_plan(targets, total, settings)
+        shard_targets = assign_shards(targets, total)[index - 1]
+        written = run_targets(shard_targets, timings)
+        record_build_stats(shard_targets, timings)
+        tarball = pack_shard(index, plan, shard_targets, written, args.shard_dir)
+        print(f"Shard {index}/{total}: {len(shard_targets)} targets, {len(written)} files -> {tarball}")
+        if MEMORY_BUDGET is not None:
+            MEMORY_BUDGET.report()
+        return
+
+    run_targets(targets, timings)
+    record_build_stats(targets, timings)
+    report_pruned_posters(path for target in targets for path in target.outputs)
+    print("Store assets generated successfully.")
+    for theme in themes:
+        if len(themes) > 1:
+            print(f"{theme.name} ({theme.output_root}):")
+        print(f"- Logos: {theme.path(LOGO_DIR)}")
+        print(f"- iOS screenshots: {theme.path(IOS_SCREENSHOT_DIR_EN)} and {theme.path(IOS_SCREENSHOT_DIR_ZH)}")
+        print(
+            "- Android assets: "
+            f"{theme.path(ANDROID_IMAGES_DIR)}, {theme.path(ANDROID_EN_SCREENSHOT_DIR)}, "
+            f"{theme.path(ANDROID_ZH_SCREENSHOT_DIR)}"
+        )
+    if MEMORY_BUDGET is not None:
+        MEMORY_BUDGET.report()
 
 
 if __name__ == "__main__":